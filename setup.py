@@ -19,5 +19,7 @@ setuptools.setup(
         "Operating System :: OS Independent",
     ],
     install_requires=["pandas>=0.24", "pyreadstat>=0.2.9", "many_stop_words>=0.2"],
+    extras_require={"parquet": ["pyarrow"]},
+    entry_points={"console_scripts": ["survey-toolkit=survey_toolkit.cli:main"]},
     python_requires='>=3.6',
 )
@@ -0,0 +1,18 @@
+"""Deferred imports of heavy dependencies"""
+import importlib
+
+
+class LazyModule:
+    """Stands in for a module and imports it on first attribute access"""
+
+    def __init__(self, name):
+        self._name = name
+        self._module = None
+
+    def __repr__(self):
+        return f"{self.__class__.__name__}({self._name!r})"
+
+    def __getattr__(self, attr):
+        if self._module is None:
+            self._module = importlib.import_module(self._name)
+        return getattr(self._module, attr)
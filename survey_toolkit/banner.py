@@ -0,0 +1,204 @@
+"""Banner tables: many row questions crossed with many banner questions in one pass"""
+# pylint: disable=cyclic-import
+import math
+from string import ascii_uppercase
+from ._lazy import LazyModule
+from .core import ChoiceQuestion, MatrixQuestion, _as_list
+
+np = LazyModule('numpy')
+pd = LazyModule('pandas')
+
+
+class BannerTable:
+    """Counts, column percentages and significance of row questions by banner questions
+
+    Cell frames are indexed by (question, choice) of row questions and have (question, choice)
+    columns of banner questions; base frames are indexed by row question only. `significance`
+    holds the letters of columns of the same banner question whose proportion is significantly
+    lower than the cell's, `residuals` adjusted standardized residuals of each cell.
+    """
+
+    def __init__(self, counts, percentages, bases, effective_bases, residuals, significance,
+                 letters, critical_value):
+        self.counts = counts
+        self.percentages = percentages
+        self.bases = bases
+        self.effective_bases = effective_bases
+        self.residuals = residuals
+        self.significance = significance
+        self.letters = letters
+        self.critical_value = critical_value
+
+    def __repr__(self):
+        return f"{self.__class__.__name__}(shape={self.counts.shape})"
+
+
+def compute_banner(survey, rows, banners, weights=None, alpha=0.05, to_labels=True,
+                   chunksize=10000) -> BannerTable:
+    """Crosses every row question with every banner question using batched matrix products
+
+    Answers are read chunk by chunk into indicator matrices, so one product per chunk counts
+    all cells of all tables. `weights` is the name of a numeric question or a sequence with one
+    weight per respondent; missing weights count as 0. Column proportions are compared with
+    two-sided z-tests at `alpha` using effective bases (Kish), and residuals are scaled by the
+    ratio of effective to weighted base, so weighting does not inflate significance. Multiple
+    choice answers are counted once per selected choice.
+    """
+    row_questions = [_get_banner_question(survey, name) for name in rows]
+    banner_questions = [_get_banner_question(survey, name) for name in banners]
+    row_categories = [_get_categories(question) for question in row_questions]
+    banner_categories = [_get_categories(question) for question in banner_questions]
+    row_offsets = _get_offsets(row_categories)
+    banner_offsets = _get_offsets(banner_categories)
+    row_width = row_offsets[-1]
+    banner_width = banner_offsets[-1]
+    sums = np.zeros((row_width + len(row_questions), banner_width + len(banner_questions)))
+    squared_sums = np.zeros((len(row_questions), banner_width + len(banner_questions)))
+    respondent_count = survey.watermark
+    if weights is not None and not isinstance(weights, str) and \
+            len(weights) != respondent_count:
+        raise ValueError(f"Expected {respondent_count} weights, got {len(weights)}")
+    for start in range(0, respondent_count, chunksize):
+        stop = min(start + chunksize, respondent_count)
+        chunk_weights = _get_weights(survey, weights, start, stop)
+        left = _get_indicators(row_questions, row_categories, row_offsets, start, stop)
+        right = _get_indicators(banner_questions, banner_categories, banner_offsets, start, stop)
+        sums += left.T @ (right * chunk_weights[:, None])
+        squared_sums += left[:, row_width:].T @ (right * (chunk_weights ** 2)[:, None])
+
+    counts = sums[:row_width, :banner_width]
+    row_totals = sums[:row_width, banner_width:]
+    bases = sums[row_width:, :banner_width]
+    totals = sums[row_width:, banner_width:]
+    row_numbers = np.repeat(np.arange(len(row_questions)), np.diff(row_offsets))
+    banner_numbers = np.repeat(np.arange(len(banner_questions)), np.diff(banner_offsets))
+    with np.errstate(divide='ignore', invalid='ignore'):
+        effective_bases = np.where(squared_sums[:, :banner_width] > 0,
+                                   bases ** 2 / squared_sums[:, :banner_width], 0)
+        effective_totals = np.where(squared_sums[:, banner_width:] > 0,
+                                    totals ** 2 / squared_sums[:, banner_width:], 0)
+        cell_bases = bases[row_numbers]
+        proportions = np.where(cell_bases > 0, counts / cell_bases, np.nan)
+        residuals = _get_residuals(counts, row_totals[:, banner_numbers], cell_bases,
+                                   totals[row_numbers][:, banner_numbers],
+                                   effective_totals[row_numbers][:, banner_numbers])
+        critical_value = _get_normal_quantile(1 - alpha / 2)
+        letters = [_get_column_letter(position) for categories in banner_categories
+                   for position in range(len(categories))]
+        significance = np.full(counts.shape, '', dtype=object)
+        for number in range(len(banner_questions)):
+            columns = slice(banner_offsets[number], banner_offsets[number + 1])
+            higher = _get_z_scores(counts[:, columns], cell_bases[:, columns],
+                                   effective_bases[row_numbers][:, columns]) > critical_value
+            for row, column, other in zip(*np.nonzero(higher)):
+                significance[row, columns.start + column] += letters[columns.start + other]
+
+    index = _get_index(row_questions, row_categories, to_labels)
+    columns = _get_index(banner_questions, banner_categories, to_labels)
+    base_index = pd.Index([question.label if to_labels else question.name
+                           for question in row_questions], name='question')
+    return BannerTable(
+        counts=pd.DataFrame(counts, index=index, columns=columns),
+        percentages=pd.DataFrame(proportions * 100, index=index, columns=columns),
+        bases=pd.DataFrame(bases, index=base_index, columns=columns),
+        effective_bases=pd.DataFrame(effective_bases, index=base_index, columns=columns),
+        residuals=pd.DataFrame(residuals, index=index, columns=columns),
+        significance=pd.DataFrame(significance, index=index, columns=columns),
+        letters=pd.Series(letters, index=columns, dtype=object),
+        critical_value=critical_value)
+
+
+def _get_banner_question(survey, name):
+    question = survey.get_question(name)
+    if not isinstance(question, ChoiceQuestion) or isinstance(question, MatrixQuestion):
+        raise ValueError(f"Banner tables of question {name} are not supported")
+    return question
+
+
+def _get_categories(question):
+    return list(question.choices) if question.choices else question.get_unique_answers()
+
+
+def _get_offsets(categories):
+    return np.concatenate([[0], np.cumsum([len(values) for values in categories])]).astype(int)
+
+
+def _get_weights(survey, weights, start, stop):
+    if weights is None:
+        return np.ones(stop - start)
+    if isinstance(weights, str):
+        # pylint: disable=protected-access
+        values = survey.get_question(weights)._slice_answers(start, stop)
+        values = np.array([np.nan if value is None else value for value in values], dtype=float)
+    else:
+        values = np.asarray(weights[start:stop], dtype=float)
+    return np.where(np.isnan(values), 0.0, values)
+
+
+def _get_indicators(questions, categories, offsets, start, stop):
+    """Respondents by choices of all questions, then one column per question for answering"""
+    indicators = np.zeros((stop - start, offsets[-1] + len(questions)))
+    for number, (question, question_categories) in enumerate(zip(questions, categories)):
+        positions = {category: position
+                     for position, category in enumerate(question_categories, offsets[number])}
+        respondents = []
+        columns = []
+        # pylint: disable=protected-access
+        for respondent, answer in enumerate(question._slice_answers(start, stop)):
+            if answer is None:
+                continue
+            for value in _as_list(answer):
+                if value in positions:
+                    respondents.append(respondent)
+                    columns.append(positions[value])
+        indicators[respondents, columns] = 1
+        indicators[:, offsets[-1] + number] = \
+            indicators[:, offsets[number]:offsets[number + 1]].any(axis=1)
+    return indicators
+
+
+def _get_residuals(counts, row_totals, column_totals, totals, effective_totals):
+    expected = row_totals * column_totals / totals
+    residuals = (counts - expected) / np.sqrt(
+        expected * (1 - row_totals / totals) * (1 - column_totals / totals))
+    return residuals * np.sqrt(effective_totals / totals)
+
+
+def _get_z_scores(counts, bases, effective_bases):
+    """Z scores of each column's proportion against each other column, shaped rows x k x k"""
+    proportions = counts / bases
+    pooled = (counts[:, :, None] + counts[:, None, :]) / (bases[:, :, None] + bases[:, None, :])
+    variance = pooled * (1 - pooled) * (1 / effective_bases[:, :, None] +
+                                        1 / effective_bases[:, None, :])
+    z_scores = (proportions[:, :, None] - proportions[:, None, :]) / np.sqrt(variance)
+    return np.where(np.isfinite(z_scores), z_scores, 0.0)
+
+
+def _get_normal_quantile(probability):
+    """Inverse of the standard normal distribution function, found by bisection"""
+    if not 0 < probability < 1:
+        raise ValueError("alpha must be between 0 and 1")
+    low, high = -40.0, 40.0
+    for _ in range(100):
+        middle = (low + high) / 2
+        if math.erfc(-middle / math.sqrt(2)) / 2 < probability:
+            low = middle
+        else:
+            high = middle
+    return (low + high) / 2
+
+
+def _get_column_letter(position):
+    letter = ascii_uppercase[position % len(ascii_uppercase)]
+    return letter if position < len(ascii_uppercase) else \
+        f"{letter}{position // len(ascii_uppercase)}"
+
+
+def _get_index(questions, categories, to_labels):
+    tuples = []
+    for question, question_categories in zip(questions, categories):
+        name = question.label if to_labels else question.name
+        for category in question_categories:
+            label = question.choices[category] if to_labels and question.choices else category
+            tuples.append((name, label))
+    return pd.MultiIndex.from_tuples(tuples, names=['question', 'choice'])
@@ -0,0 +1,264 @@
+"""Command line interface"""
+import argparse
+import itertools
+import json
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+FORMATS = ('csv', 'parquet', 'sav')
+
+
+def main(argv=None) -> int:
+    parser = _get_parser()
+    args = parser.parse_args(argv)
+    if args.command != 'convert':
+        parser.print_help()
+        return 1
+    output_format = args.format or os.path.splitext(args.output)[1].lstrip('.').lower()
+    if output_format not in FORMATS:
+        parser.error(f"Unknown output format {output_format!r}, use --format")
+    with open(args.survey_json, encoding='utf-8') as file:
+        survey_json = json.load(file)
+    columns = args.columns.split(',') if args.columns else None
+    convert(survey_json, args.results, args.output, output_format=output_format,
+            to_labels=args.to_labels, to_dummies=args.to_dummies, optimize=args.optimize,
+            columns=columns, workers=args.workers, chunk_size=args.chunk_size,
+            matrix_as_block=args.matrix_as_block, progress=sys.stderr if args.progress else None)
+    return 0
+
+
+def convert(survey_json: dict, results_path, output_path, output_format='csv', to_labels=False,
+            to_dummies=False, optimize=False, columns=None, workers=1, chunk_size=10000,
+            matrix_as_block=False, progress=None) -> int:
+    """Converts surveyjs NDJSON results to a csv, parquet or sav file, chunk by chunk
+
+    Chunks of `chunk_size` results are decoded and turned into frames by `workers` processes,
+    with at most two chunks per worker in flight, and appended to the output in order. Sav
+    files cannot be appended to, so their frames are collected in memory before writing; they
+    always use question names, with labels kept as variable and value labels. Returns the
+    number of converted results; throughput is reported to the `progress` stream if given.
+    """
+    from .core import Survey
+    if output_format == 'sav':
+        to_labels = False
+    options = {'to_labels': to_labels, 'to_dummies': to_dummies, 'optimize': optimize,
+               'columns': columns, 'matrix_as_block': matrix_as_block}
+    survey = Survey.from_surveyjs(survey_json, matrix_as_block=matrix_as_block)
+    writer = _get_writer(output_format, output_path, survey, options)
+    started = time.monotonic()
+    converted = 0
+    with open(results_path, encoding='utf-8') as results:
+        chunks = _iter_chunks((line for line in results if line.strip()), chunk_size)
+        for frame in _convert_chunks(survey_json, chunks, options, workers):
+            frame.index += converted
+            writer.write(frame)
+            converted += len(frame)
+            if progress is not None:
+                elapsed = time.monotonic() - started
+                print(f"{converted} results, {converted / max(elapsed, 1e-9):.0f} results/s",
+                      file=progress)
+    writer.close(_get_column_metadata(survey, to_dummies, optimize))
+    return converted
+
+
+def _get_parser():
+    parser = argparse.ArgumentParser(prog='survey-toolkit', description=__doc__)
+    subparsers = parser.add_subparsers(dest='command')
+    convert_parser = subparsers.add_parser(
+        'convert', help="Convert surveyjs NDJSON results to csv, parquet or sav")
+    convert_parser.add_argument('survey_json', help="surveyjs survey definition json file")
+    convert_parser.add_argument('results', help="NDJSON file with one surveyjs result per line")
+    convert_parser.add_argument('output', help="output file")
+    convert_parser.add_argument('--format', choices=FORMATS,
+                                help="output format, guessed from output extension by default; "
+                                     "sav output is held in memory until all results are read")
+    convert_parser.add_argument('--to-labels', action='store_true',
+                                help="use question and choice labels instead of names; sav "
+                                     "output always keeps them as variable and value labels")
+    convert_parser.add_argument('--to-dummies', action='store_true',
+                                help="expand multiple choice questions to dummy columns")
+    convert_parser.add_argument('--optimize', action='store_true',
+                                help="convert choice keys to numeric codes")
+    convert_parser.add_argument('--columns', help="comma separated names of questions to export")
+    convert_parser.add_argument('--matrix-as-block', action='store_true',
+                                help="keep matrix questions as single block questions")
+    convert_parser.add_argument('--workers', type=int, default=1,
+                                help="number of worker processes (default: 1)")
+    convert_parser.add_argument('--chunk-size', type=int, default=10000,
+                                help="results per chunk (default: 10000)")
+    convert_parser.add_argument('--progress', action='store_true',
+                                help="report throughput to stderr")
+    return parser
+
+
+def _get_column_metadata(survey, to_dummies, optimize):
+    from .core import MultipleChoiceQuestion
+    metadata = survey.get_metadata(to_dummies=to_dummies, optimize=optimize)
+    if to_dummies:
+        for question in survey.questions:
+            if isinstance(question, MultipleChoiceQuestion):
+                metadata.update({name: {'name': name, 'label': label}
+                                 for name, label in question.get_dummy_variables().items()})
+    return metadata
+
+
+def _iter_chunks(lines, chunk_size):
+    while True:
+        chunk = list(itertools.islice(lines, chunk_size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def _convert_chunks(survey_json, chunks, options, workers):
+    if workers <= 1:
+        for chunk in chunks:
+            yield _convert_chunk(survey_json, options, chunk)
+        return
+    with ProcessPoolExecutor(workers) as executor:
+        pending = deque()
+        for chunk in chunks:
+            pending.append(executor.submit(_convert_chunk, survey_json, options, chunk))
+            if len(pending) >= 2 * workers:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
+def _convert_chunk(survey_json, options, lines):
+    from .core import Survey
+    survey = Survey.from_surveyjs(survey_json, lines, matrix_as_block=options['matrix_as_block'])
+    return survey.to_pandas(to_labels=options['to_labels'], to_dummies=options['to_dummies'],
+                            optimize=options['optimize'], columns=options['columns'])
+
+
+def _get_writer(output_format, path, survey, options):
+    if output_format == 'parquet':
+        return _ParquetWriter(path, *_get_parquet_layout(survey, options))
+    if output_format == 'sav':
+        return _SavWriter(path)
+    return _CsvWriter(path)
+
+
+class _CsvWriter:
+
+    def __init__(self, path):
+        self.path = path
+        self._header = True
+
+    def write(self, frame):
+        frame.to_csv(self.path, mode='w' if self._header else 'a', header=self._header,
+                     index=False)
+        self._header = False
+
+    def close(self, metadata):  # pylint: disable=unused-argument
+        pass
+
+
+def _get_parquet_layout(survey, options):
+    """Arrow schema of converted frames and names of columns written as json
+
+    The schema comes from the survey definition rather than the first chunk, in which an
+    optional question may have no answers and so no inferable type. Text is written as plain
+    strings, since dictionaries of different chunks differ, and nested answers as json.
+    """
+    import pyarrow as pa
+    from .core import NestedQuestion
+    questions = survey.questions if options['columns'] is None else \
+        [survey.get_question(name) for name in options['columns']]
+    fields = []
+    json_columns = []
+    for question in questions:
+        frame = question.to_frame(options['to_labels'], options['to_dummies'],
+                                  options['optimize'])
+        for field in pa.Schema.from_pandas(frame, preserve_index=False):
+            if isinstance(question, NestedQuestion):
+                json_columns.append(field.name)
+                field = field.with_type(pa.string())
+            elif not _has_fixed_type(question, field, options):
+                field = field.with_type(_get_arrow_type(question, options))
+            fields.append(field)
+    return pa.schema(fields), json_columns
+
+
+def _has_fixed_type(question, field, options):
+    """Whether the type inferred from an empty frame holds for every chunk"""
+    import pyarrow as pa
+    from .core import MultipleChoiceQuestion, NumericInputQuestion, TextInputQuestion
+    if isinstance(question, NumericInputQuestion):
+        return True
+    if isinstance(question, MultipleChoiceQuestion):
+        return options['to_dummies']
+    return pa.types.is_dictionary(field.type) and not isinstance(question, TextInputQuestion)
+
+
+def _get_arrow_type(question, options):
+    import pyarrow as pa
+    from .core import MultipleChoiceQuestion
+    if not isinstance(question, MultipleChoiceQuestion):
+        return pa.string()
+    if options['to_labels']:
+        return pa.list_(pa.string())
+    integer_keys = options['optimize'] or bool(question.choices) and \
+        all(isinstance(choice, int) for choice in question.choices)
+    return pa.list_(pa.int64() if integer_keys else pa.string())
+
+
+class _ParquetWriter:
+
+    def __init__(self, path, schema, json_columns):
+        self.path = path
+        self.schema = schema
+        self.json_columns = json_columns
+        self._writer = None
+
+    def write(self, frame):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+        for column in self.json_columns:
+            frame[column] = [json.dumps(value) if value is not None else None
+                             for value in frame[column]]
+        table = pa.Table.from_pandas(frame, preserve_index=False)
+        if not table.schema.equals(self.schema):
+            table = table.cast(self.schema)
+        if self._writer is None:
+            self._writer = pq.ParquetWriter(self.path, self.schema)
+        self._writer.write_table(table)
+
+    def close(self, metadata):  # pylint: disable=unused-argument
+        if self._writer is not None:
+            self._writer.close()
+
+
+class _SavWriter:
+
+    def __init__(self, path):
+        self.path = path
+        self._frames = []
+
+    def write(self, frame):
+        self._frames.append(frame)
+
+    def close(self, metadata):
+        import pandas as pd
+        import pyreadstat
+        frame = pd.concat(self._frames) if self._frames else pd.DataFrame()
+        for column in frame.columns:
+            if isinstance(frame[column].dtype, pd.CategoricalDtype):
+                numeric = pd.api.types.is_numeric_dtype(frame[column].cat.categories)
+                frame[column] = frame[column].astype(float if numeric else object)
+        column_labels = [metadata[column]['label'] if column in metadata else column
+                         for column in frame.columns]
+        value_labels = {column: metadata[column]['choices'] for column in frame.columns
+                        if column in metadata and metadata[column].get('choices') and
+                        pd.api.types.is_numeric_dtype(frame[column]) and
+                        all(isinstance(key, int) for key in metadata[column]['choices'])}
+        pyreadstat.write_sav(frame, self.path, column_labels=column_labels,
+                             variable_value_labels=value_labels)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -2,16 +2,26 @@
 # pylint: disable=missing-docstring
 
 import json
+import sys
+import threading
+from array import array
 from copy import copy
 import re
 from collections import Counter
-import pandas as pd
-import many_stop_words
+from contextlib import suppress
+from ._lazy import LazyModule
+from .storage import AnswerStore
+
+# loaded on first use, so that parsing metadata does not pay for importing them
+np = LazyModule('numpy')
+pd = LazyModule('pandas')
+many_stop_words = LazyModule('many_stop_words')
 
 
 class Question:
 
     data_type = str
+    storage = None
 
     def __init__(self, name, label=None, answers=None, **kwargs):
         self.name = name
@@ -37,16 +47,52 @@ class Question:
     def answers(self):
         return self._answers
 
+    @property
+    def answer_count(self):
+        return len(self._answers)
+
     @answers.setter
     def answers(self, value: list):
-        self._answers = []  # pylint: disable=attribute-defined-outside-init
+        # pylint: disable=attribute-defined-outside-init
+        previous = self.__dict__.get('_answers')
+        self._answers = self.storage.create(self) if self.storage else []
         if value:
             for item in value:
                 self._add_answer(item)
+        _drop_store(previous)
+
+    def set_storage(self, storage) -> bool:
+        """Moves answers to a store created by `storage`, e.g. one from `survey_toolkit.storage`
+
+        None moves them back to a list in memory. Returns False, leaving answers where they
+        are, if the storage does not support this question.
+        """
+        store = storage.create(self) if storage is not None else []
+        if store is None:
+            return False
+        store.extend(self._answers)
+        previous = self._answers
+        self._answers = store  # pylint: disable=attribute-defined-outside-init
+        self.storage = storage
+        _drop_store(previous)
+        return True
+
+    def iter_answer_chunks(self, chunksize=10000):
+        """Yields lists of consecutive answers, reading on-disk storage one chunk at a time"""
+        for start in range(0, self.answer_count, chunksize):
+            yield self._slice_answers(start, start + chunksize)
 
     def add_answer(self, value):
         self._add_answer(value)
 
+    def add_answers(self, values):
+        for value in values:
+            self._add_answer(value)
+
+    def get_result_answer(self, result: dict):
+        """Picks this question's answer from a flattened result"""
+        return result.get(self.name, None)
+
     def get_unique_answers(self):
         return self._get_unique_answers(self.answers)
 
@@ -59,14 +105,80 @@ class Question:
     def clean_html_labels(self):
         self._clean_labels(regex='<.*?>')
 
-    def to_series(self, to_labels=False):
-        return self._to_series(answers=self.answers, to_labels=to_labels)
+    def to_series(self, to_labels=False, since=0, until=None):
+        """Creates pandas Series from answers of respondents from `since` up to `until`"""
+        return self._to_series(answers=self._slice_answers(since, until), to_labels=to_labels,
+                               since=since)
+
+    def iter_tidy(self, start=0, stop=None):
+        """Yields (respondent_id, question_name, value_code, value_label) for given respondents
+
+        Respondent ids are positions in the survey; missing answers are skipped.
+        """
+        for respondent, answer in enumerate(self._slice_answers(start, stop), start):
+            if answer is not None:
+                yield from self._get_tidy_values(respondent, answer)
 
     def get_metadata(self, to_dummies=False, optimize=False):
         return self._get_metadata(to_dummies=to_dummies, optimize=optimize)
 
-    def to_frame(self, to_labels=False, to_dummies=False, optimize=False):
-        return self._to_frame(to_labels=to_labels, to_dummies=to_dummies, optimize=optimize)
+    def get_column_metadata(self, to_dummies=False, optimize=False):
+        """Metadata keyed by exported column name"""
+        return {self.name: self.get_metadata(to_dummies, optimize)}
+
+    def to_frame(self, to_labels=False, to_dummies=False, optimize=False, since=0, until=None):
+        return self._to_frame(to_labels=to_labels, to_dummies=to_dummies, optimize=optimize,
+                              since=since, until=until)
+
+    def memory_usage(self, deep=True) -> 'pd.Series':
+        """Bytes held by answer storage, choice maps and derived lookup structures
+
+        With `deep`, sizes of contained objects are included, each object counted once.
+        """
+        usage = {}
+        for part, objects in self._get_storage().items():
+            seen = set()
+            usage[part] = sum(_get_object_size(obj, deep, seen) for obj in objects)
+        usage['total'] = sum(usage.values())
+        return pd.Series(usage, name=self.name)
+
+    def estimate_frame_size(self, to_labels=False, to_dummies=False, optimize=False) -> int:
+        """Estimates bytes of `to_frame` output for given flags without building it"""
+        return self._estimate_frame_size(to_labels=to_labels, to_dummies=to_dummies,
+                                         optimize=optimize)
+
+    def _slice_answers(self, start, stop):
+        return self.answers[start:stop]
+
+    def _get_tidy_values(self, respondent, answer):
+        yield (respondent, self.name, answer, None)
+
+    def _get_storage(self):
+        return {'answers': [self._answers], 'choices': [], 'derived': []}
+
+    def _get_empty_copy(self):
+        question = copy(self)
+        question.__dict__.pop('_answers', None)  # shared with self, which keeps it
+        question.answers = []
+        return question
+
+    def _get_export_copy(self):
+        """Question to export chunk by chunk; see `Survey.iter_frames`"""
+        return self
+
+    def _append_answers_from(self, other, count):
+        """Appends stored answers of the same question from another survey without validation
+
+        `count` missing answers are appended if `other` is None.
+        """
+        self._answers.extend(other.answers if other is not None else [None] * count)
+
+    def _estimate_frame_size(self, **kwargs):  # pylint:disable=unused-argument
+        return _get_object_column_size(self._answers)
+
+    def _truncate_answers(self, count):
+        """Drops answers after the first `count`, e.g. of a partially added result"""
+        del self._answers[count:]
 
     def _clean_labels(self, regex):
         if self._label:
@@ -77,11 +189,13 @@ class Question:
             value = self.data_type(value)
         self._answers.append(value)
 
-    def _to_series(self, answers: list, to_labels: bool):
-        return pd.Series(answers, name=self.label if to_labels else self.name)
+    def _to_series(self, answers: list, to_labels: bool, since=0):
+        return pd.Series(answers, index=self._get_index(answers, since),
+                         name=self.label if to_labels else self.name)
 
     def _to_frame(self, **kwargs):
-        return self.to_series(to_labels=kwargs['to_labels']).to_frame()
+        return self.to_series(to_labels=kwargs['to_labels'], since=kwargs['since'],
+                              until=kwargs['until']).to_frame()
 
     def _summary(self, **kwargs):  # pylint:disable=unused-argument
         name = self.label
@@ -90,6 +204,10 @@ class Question:
     def _get_metadata(self, **kwargs):  # pylint:disable=unused-argument
         return {'name': self.name, 'label': self.label}
 
+    @staticmethod
+    def _get_index(answers, since):
+        return pd.RangeIndex(since, since + len(answers))
+
     @staticmethod
     def _get_unique_answers(answers):
         unique_answers = set(answers)
@@ -98,33 +216,239 @@ class Question:
 
 
 class NumericInputQuestion(Question):
+    """Numeric input question
+
+    `dtype` sets the pandas dtype of exported series, e.g. 'float32' or nullable 'Int16' for
+    compact frames; float64 is used if not given. Answers are kept as floats either way, but
+    with an integer dtype, fractions and numbers out of its range are rejected when added.
+    """
 
     data_type = float
 
+    def __init__(self, name, label=None, answers=None, dtype=None, **kwargs):
+        self.dtype = dtype
+        super(NumericInputQuestion, self).__init__(name, label=label, answers=answers)
+
+    def add_answers(self, values, errors='raise'):
+        """Parses a batch of answers at once and returns the mask of rejected ones
+
+        Values are rejected if unparseable or not fitting an integer `dtype`. With
+        errors='raise' nothing is added if any value is rejected, with errors='coerce' rejected
+        values are added as None.
+        """
+        parsed, invalid = self.parse_values(values)
+        if errors == 'raise' and invalid.any():
+            unparseable = [value for (value, is_invalid) in zip(values, invalid) if is_invalid]
+            raise ValueError(f"Values {unparseable} unparseable in question {self.name}")
+        unfit = self._get_unfit_mask(parsed)
+        if errors == 'raise' and unfit.any():
+            unfit_values = [value for (value, is_unfit) in zip(values, unfit) if is_unfit]
+            raise ValueError(f"Values {unfit_values} do not fit dtype {self.dtype} of question "
+                             f"{self.name}")
+        parsed[unfit] = np.nan
+        invalid = invalid | unfit
+        self._answers.extend([value if value == value else None for value in parsed.tolist()])
+        return invalid
+
+    @staticmethod
+    def parse_values(values) -> tuple:
+        """Parses numbers, also written with decimal commas and thousands separators
+
+        Returns float array, with NaN for blank and unparseable values, and the mask of
+        unparseable values. Values plain numbers cannot be read from are parsed by
+        `parse_value`, so both give the same result for every value.
+        """
+        series = pd.Series(values, dtype=object)
+        numbers = pd.to_numeric(series, errors='coerce').astype(float)
+        blank = series.isna() | series.astype(str).str.strip().eq('')
+        retry = numbers.isna() & ~blank
+        if retry.any():
+            numbers[retry] = [_parse_number_or_nan(value) for value in series[retry]]
+        invalid = (numbers.isna() & ~blank).to_numpy()
+        return numbers.to_numpy(), invalid
+
+    @staticmethod
+    def parse_value(value):
+        """Parses a number like `parse_values`; None if blank, ValueError if unparseable"""
+        if value is None:
+            return None
+        if isinstance(value, (int, float)):
+            return float(value) if value == value else None
+        text = str(value).strip()
+        if not text:
+            return None
+        text = _NUMBER_SEPARATORS.sub('', text)
+        if ',' in text or text.count('.') > 1:
+            if text.count('.') > 1 or text.count(',') == 1 and text.rfind(',') > text.rfind('.'):
+                text = text.replace('.', '').replace(',', '.')
+            else:
+                text = text.replace(',', '')
+        number = float(text)
+        if number != number:
+            raise ValueError(f"could not convert string to float: {value!r}")
+        return number
+
     def _add_answer(self, value):
         try:
-            super(NumericInputQuestion, self)._add_answer(value)
+            number = self.parse_value(value)
         except ValueError:
-            super(NumericInputQuestion, self)._add_answer(value.replace(',', '.'))
+            raise ValueError(f"Value {value} unparseable in question {self.name}") from None
+        if number is not None and self.dtype is not None and \
+                self._get_unfit_mask(np.array([number]))[0]:
+            raise ValueError(f"Value {value} does not fit dtype {self.dtype} of question "
+                             f"{self.name}")
+        self._answers.append(number)
+
+    def _get_unfit_mask(self, numbers):
+        """Mask of numbers an integer `dtype` cannot hold: fractions and out of range ones"""
+        dtype = pd.api.types.pandas_dtype(self.dtype) if self.dtype is not None else None
+        dtype = getattr(dtype, 'numpy_dtype', dtype)
+        if getattr(dtype, 'kind', None) not in ('i', 'u'):
+            return np.zeros(len(numbers), dtype=bool)
+        info = np.iinfo(dtype)
+        with np.errstate(invalid='ignore'):
+            return ~np.isnan(numbers) & ((numbers != np.floor(numbers)) |
+                                         (numbers < info.min) | (numbers > info.max))
+
+    def _to_series(self, answers: list, to_labels: bool, since=0):
+        series = super(NumericInputQuestion, self)._to_series(answers, to_labels, since)
+        try:
+            return series.astype(self.dtype or 'float64')
+        except (TypeError, ValueError) as error:
+            raise ValueError(f"Answers of question {self.name} cannot be exported as "
+                             f"{self.dtype}: {error}") from error
+
+    def _estimate_frame_size(self, **kwargs):
+        dtype = pd.api.types.pandas_dtype(self.dtype or 'float64')
+        mask_size = 1 if isinstance(dtype, pd.api.extensions.ExtensionDtype) else 0
+        return self.answer_count * (dtype.itemsize + mask_size)
 
     def _summary(self, **kwargs):
-        return self.to_series().describe()
+        chunks = [np.array(chunk, dtype=float) for chunk in self.iter_answer_chunks()]
+        values = np.concatenate(chunks) if chunks else np.empty(0)
+        return pd.Series(values, name=self.name).describe()
 
 
 class TextInputQuestion(Question):
+    """Open text question
+
+    With `dictionary_encoded`, answers are interned: stored as an array of codes into a table of
+    unique strings, and exported as a pandas categorical without expanding them.
+    """
+
+    def __init__(self, name, label=None, answers=None, dictionary_encoded=False, **kwargs):
+        self.dictionary_encoded = dictionary_encoded
+        super(TextInputQuestion, self).__init__(name, label=label, answers=answers)
+
+    @property
+    def answers(self):
+        if not self.dictionary_encoded:
+            return self._answers
+        return self._slice_answers(0, None)
+
+    @answers.setter
+    def answers(self, value: list):
+        # pylint: disable=attribute-defined-outside-init
+        self._codes = array('i')
+        self._values = []
+        self._value_codes = {}
+        Question.answers.fset(self, value)
+
+    @property
+    def answer_count(self):
+        return len(self._codes) if self.dictionary_encoded else len(self._answers)
+
+    def to_series(self, to_labels=False, since=0, until=None):
+        if not self.dictionary_encoded:
+            return super(TextInputQuestion, self).to_series(to_labels, since, until)
+        start, stop, _ = slice(since, until).indices(len(self._codes))
+        codes = np.array(memoryview(self._codes)[start:max(start, stop)], dtype=np.intc)
+        categorical = pd.Categorical.from_codes(codes, categories=self._values)
+        return pd.Series(categorical, index=self._get_index(codes, since),
+                         name=self.label if to_labels else self.name)
+
+    def set_storage(self, storage) -> bool:
+        if self.dictionary_encoded:
+            return False
+        return super(TextInputQuestion, self).set_storage(storage)
+
+    def get_value_counts(self) -> dict:
+        """Counts of each distinct non-empty answer"""
+        if not self.dictionary_encoded:
+            value_counts = Counter()
+            for chunk in self.iter_answer_chunks():
+                value_counts.update(answer for answer in chunk if answer is not None)
+            return value_counts
+        codes = np.array(self._codes, dtype=np.intc)
+        counts = np.bincount(codes[codes >= 0], minlength=len(self._values))
+        return dict(zip(self._values, counts.tolist()))
+
+    def _add_answer(self, value):
+        if not self.dictionary_encoded:
+            super(TextInputQuestion, self)._add_answer(value)
+            return
+        self._codes.append(self._get_value_code(self.data_type(value)) if value is not None
+                           else -1)
+
+    def _append_answers_from(self, other, count):
+        if not self.dictionary_encoded:
+            super(TextInputQuestion, self)._append_answers_from(other, count)
+        elif other is None:
+            self._codes.extend([-1] * count)
+        elif other.dictionary_encoded:
+            remap = np.array([self._get_value_code(value) for value in other._values] + [-1],
+                             dtype=np.intc)
+            self._codes.extend(remap[np.array(other._codes, dtype=np.intc)].tolist())
+        else:
+            self._codes.extend([self._get_value_code(value) if value is not None else -1
+                                for value in other.answers])
+
+    def _truncate_answers(self, count):
+        if not self.dictionary_encoded:
+            super(TextInputQuestion, self)._truncate_answers(count)
+            return
+        del self._codes[count:]
+
+    def _slice_answers(self, start, stop):
+        if not self.dictionary_encoded:
+            return super(TextInputQuestion, self)._slice_answers(start, stop)
+        values = self._values
+        return [values[code] if code >= 0 else None for code in self._codes[start:stop]]
+
+    def _get_value_code(self, value):
+        code = self._value_codes.get(value)
+        if code is None:
+            code = self._value_codes[value] = len(self._values)
+            self._values.append(value)
+        return code
+
+    def _get_storage(self):
+        if not self.dictionary_encoded:
+            return super(TextInputQuestion, self)._get_storage()
+        return {'answers': [self._codes, self._values], 'choices': [],
+                'derived': [self._value_codes]}
+
+    def _estimate_frame_size(self, **kwargs):
+        if not self.dictionary_encoded:
+            return super(TextInputQuestion, self)._estimate_frame_size(**kwargs)
+        return _get_categorical_size(self.answer_count, self._values)
 
     def _summary(self, **kwargs):
-        str_corpus = " ".join(self.answers).lower()
-        words = re.sub(r"[^\w]", " ", str_corpus).split()
         stop_words = many_stop_words.get_stop_words(kwargs.get('language', 'en'))
-        filtered_words = [word for word in words if word not in stop_words]
-        summary_series = pd.Series(filtered_words).value_counts()[:20]
+        word_counts = Counter()
+        for text, count in self.get_value_counts().items():
+            for word in re.sub(r"[^\w]", " ", text.lower()).split():
+                if word not in stop_words:
+                    word_counts[word] += count
+        summary_series = pd.Series(dict(word_counts.most_common(20)), dtype='int64')
         summary_series.name = self.label
         return summary_series
 
 
 class ChoiceQuestion(Question):
 
+    _export_unique_answers = None
+
     def __init__(self, name, label=None, answers=None, choices=None, **kwargs):
         super(ChoiceQuestion, self).__init__(name, label=label)
         self.choices = choices
@@ -144,6 +468,11 @@ class ChoiceQuestion(Question):
         except AttributeError:
             return self.choices
 
+    def get_unique_answers(self):
+        if self._export_unique_answers is not None:
+            return list(self._export_unique_answers)
+        return super(ChoiceQuestion, self).get_unique_answers()
+
     def optimize(self):
         """Converts answers and choice keys to numeric values"""
         if self.data_type == int:
@@ -192,12 +521,89 @@ class ChoiceQuestion(Question):
         return [optimization_map[val] if val is not None else None for val in self.answers]
 
     def _to_frame(self, **kwargs):
-        if kwargs['optimize']:
-            question = copy(self)
-            question.optimize()
+        if not kwargs['optimize'] or self.data_type == int:
+            return super(ChoiceQuestion, self)._to_frame(**kwargs)
+        # only the exported slice is remapped; the copy keeps no answers of its own
+        optimization_map = self._get_optimization_map()
+        answers = self._remap_answers(self._slice_answers(kwargs['since'], kwargs['until']),
+                                      optimization_map)
+        question = copy(self)
+        question.choices = self._get_optimized_choices(optimization_map)
+        return question._to_series(answers, kwargs['to_labels'], kwargs['since']).to_frame()
+
+    def _get_export_copy(self):
+        """Without choices, a copy whose unique answers are found once instead of per chunk"""
+        if self.choices:
+            return self
+        question = copy(self)
+        question._export_unique_answers = self.get_unique_answers()
+        return question
+
+    def _get_storage(self):
+        storage = super(ChoiceQuestion, self)._get_storage()
+        storage['choices'] = [self._choices]
+        return storage
+
+    def _get_empty_copy(self):
+        question = super(ChoiceQuestion, self)._get_empty_copy()
+        question.choices = dict(self.choices) if self.choices else []
+        return question
+
+    def _merge_choices(self, choices) -> dict:
+        """Adds choices missing in this question and maps keys of `choices` onto own keys
+
+        Choices are matched by label first, then by key; unmatched choices whose key is taken
+        get a new key. Returns only the keys that change.
+        """
+        if not choices:
+            return {}
+        if isinstance(choices, list):
+            choices = {choice: choice for choice in choices}
+        merged_choices = dict(self.choices) if self.choices else {}
+        keys_by_label = {label: key for (key, label) in reversed(list(merged_choices.items()))}
+        mapping = {}
+        for key, label in choices.items():
+            if merged_choices.get(key) == label:
+                continue
+            if label in keys_by_label:
+                mapping[key] = keys_by_label[label]
+                continue
+            new_key = key
+            if key in merged_choices:
+                if all(isinstance(choice, int) for choice in merged_choices):
+                    new_key = max(merged_choices) + 1
+                else:
+                    suffix = 1
+                    while f"{key}_{suffix}" in merged_choices:
+                        suffix += 1
+                    new_key = f"{key}_{suffix}"
+                mapping[key] = new_key
+            merged_choices[new_key] = label
+            keys_by_label[label] = new_key
+        self.choices = merged_choices
+        return mapping
+
+    def _append_answers_from(self, other, count):
+        if other is None:
+            super(ChoiceQuestion, self)._append_answers_from(other, count)
+            return
+        mapping = self._merge_choices(other.choices)
+        if mapping:
+            self._answers.extend(self._remap_answers(other.answers, mapping))
         else:
-            question = self
-        return super(ChoiceQuestion, question)._to_frame(**kwargs)
+            self._answers.extend(other.answers)
+
+    @staticmethod
+    def _remap_answers(answers, mapping: dict):
+        return [mapping.get(answer, answer) for answer in answers]
+
+    def _get_tidy_values(self, respondent, answer):
+        yield (respondent, self.name, answer, self.choices[answer] if self.choices else answer)
+
+    def _get_frame_categories(self, **kwargs):
+        if kwargs['to_labels']:
+            return self.get_choice_labels() if self.choices else self.get_unique_answers()
+        return list(self.get_metadata(optimize=kwargs['optimize'])['choices'])
 
     def _get_metadata(self, **kwargs):
         metadata = super(ChoiceQuestion, self)._get_metadata(**kwargs)
@@ -213,12 +619,29 @@ class ChoiceQuestion(Question):
 class SingleChoiceQuestion(ChoiceQuestion):
 
     def _add_answer(self, value):
-        if self.choices and value and self.data_type(value) not in list(self.choices):
-            raise ValueError(f"Value {value} unavailable in question {self.name}")
-        super(SingleChoiceQuestion, self)._add_answer(value)
+        if self.choices and value:
+            self._answers.append(self._get_choice_key(value))
+        else:
+            super(SingleChoiceQuestion, self)._add_answer(value)
+
+    def _get_choice_key(self, value):
+        """Choice key matching value, converted to data_type or, if keys are mixed, as is"""
+        choices = list(self.choices)
+        for key in (self.data_type(value), value):
+            if key in choices:
+                return key
+        raise ValueError(f"Value {value} unavailable in question {self.name}")
 
     def _summary(self, **kwargs):
-        summary_series = self.to_series(to_labels=True).value_counts()
+        counts = Counter()
+        for chunk in self.iter_answer_chunks():
+            counts.update(answer for answer in chunk if answer is not None)
+        categories = list(self.choices) if self.choices else sorted(counts)
+        labels = [self.choices[choice] for choice in categories] if self.choices else categories
+        summary_series = pd.Series([counts[choice] for choice in categories], dtype='int64',
+                                   index=pd.CategoricalIndex(labels, categories=labels,
+                                                             ordered=True))
+        summary_series = summary_series.sort_values(ascending=False, kind='mergesort')
         summary_series.name = self.label
         return summary_series
 
@@ -226,13 +649,18 @@ class SingleChoiceQuestion(ChoiceQuestion):
         super(SingleChoiceQuestion, self)._set_choices(value)
         if self.choices and all(isinstance(choice, int) for choice in self.choices):
             self.data_type = int
+        else:
+            self.__dict__.pop('data_type', None)
+
+    def _estimate_frame_size(self, **kwargs):
+        return _get_categorical_size(self.answer_count, self._get_frame_categories(**kwargs))
 
-    def _to_series(self, answers: list, to_labels: bool):
+    def _to_series(self, answers: list, to_labels: bool, since=0):
         if to_labels:
             series_name = self.label
             if self.choices:
                 answers = [self.choices[answer] if answer is not None else None
-                           for answer in self.answers]
+                           for answer in answers]
                 categories = self.get_choice_labels()
             else:
                 categories = self.get_unique_answers()
@@ -240,45 +668,95 @@ class SingleChoiceQuestion(ChoiceQuestion):
             series_name = self.name
             categories = list(self.choices)
         categorical = pd.Categorical(answers, categories=categories, ordered=True)
-        return pd.Series(categorical, name=series_name)
+        return pd.Series(categorical, index=self._get_index(answers, since), name=series_name)
 
 
 class MultipleChoiceQuestion(ChoiceQuestion):
 
     data_type = list
 
-    def to_dummies(self, to_labels=False):
+    def to_dummies(self, to_labels=False, since=0, until=None):
+        keys = list(self.choices) if self.choices else self.get_unique_answers()
         if to_labels:
-            choices = self.get_choice_labels()
+            choices = [self.choices[key] for key in keys] if self.choices else keys
             prefix = self.label
             prefix_sep = ': '
         else:
-            choices = list(self.choices)
+            choices = keys
             prefix = self.name
             prefix_sep = '_'
-        choices = choices if choices else self.get_unique_answers()
-        target_cols = [prefix + prefix_sep + choice for choice in choices]
-        series = self.to_series(to_labels)
-        frame = series.apply(pd.Series)
-        try:
-            dummy_df = pd.get_dummies(frame.stack(), prefix=prefix, prefix_sep=prefix_sep)\
-                .sum(level=0)
-            for col in target_cols:
-                if col not in dummy_df:
-                    dummy_df[col] = 0
-            dummy_df = pd.concat([pd.DataFrame(index=frame.index), dummy_df], axis=1, sort=False)
-        except IndexError:
-            dummy_df = frame
-            for col in target_cols:
-                if col not in dummy_df:
-                    dummy_df[col] = None
-        return dummy_df[target_cols]
+        target_cols = [f"{prefix}{prefix_sep}{choice}" for choice in choices]
+        answers = self._slice_answers(since, until)
+        positions = {key: position for position, key in enumerate(keys)}
+        lengths = [len(answer_list) if answer_list is not None else 0 for answer_list in answers]
+        selected = np.array([positions.get(answer, -1) for answer_list in answers
+                             if answer_list is not None for answer in answer_list], dtype=np.intp)
+        rows = np.repeat(np.arange(len(answers)), lengths)
+        dummies = np.zeros((len(answers), len(keys)))
+        dummies[rows[selected >= 0], selected[selected >= 0]] = 1
+        dummies[[answer_list is None for answer_list in answers]] = np.nan
+        return pd.DataFrame(dummies, index=self._get_index(answers, since), columns=target_cols)
+
+    def cooccurrence(self, other=None, measure='count', to_labels=True,
+                     chunksize=10000) -> 'pd.DataFrame':
+        """Counts respondents selecting each pair of choices, of this question or by `other`'s
+
+        Selections are read chunk by chunk into sparse CSR indicators and only pairs of
+        selected choices are counted, so no dense dummy frame is built. `other` can be any
+        single or multiple choice question of the same survey. `measure` is 'count', 'lift'
+        (co-occurrence relative to independence) or 'jaccard'; only respondents who answered
+        both questions are counted.
+        """
+        if measure not in ('count', 'lift', 'jaccard'):
+            raise ValueError(f"Unknown co-occurrence measure {measure!r}")
+        other = self if other is None else other
+        if isinstance(other, MatrixQuestion) or not isinstance(other, ChoiceQuestion):
+            raise ValueError(f"Co-occurrence with question {other.name} is not supported")
+        if other.answer_count != self.answer_count:
+            raise ValueError(f"Questions {self.name} and {other.name} have different numbers of "
+                             "answers")
+        row_values = list(self.choices) if self.choices else self.get_unique_answers()
+        column_values = list(other.choices) if other.choices else other.get_unique_answers()
+        row_positions = {value: position for position, value in enumerate(row_values)}
+        column_positions = {value: position for position, value in enumerate(column_values)}
+        shape = (len(row_values), len(column_values))
+        counts = np.zeros(shape, dtype='int64')
+        row_totals = np.zeros(shape[0], dtype='int64')
+        column_totals = np.zeros(shape[1], dtype='int64')
+        base = 0
+        for row_chunk, column_chunk in zip(self.iter_answer_chunks(chunksize),
+                                           other.iter_answer_chunks(chunksize)):
+            rows = _get_choice_csr(row_chunk, row_positions)
+            columns = _get_choice_csr(column_chunk, column_positions)
+            answered = (np.diff(rows[0]) > 0) & (np.diff(columns[0]) > 0)
+            rows = _filter_csr_rows(rows, answered)
+            columns = _filter_csr_rows(columns, answered)
+            counts += _count_csr_pairs(rows, columns, shape)
+            row_totals += np.bincount(rows[1], minlength=shape[0])
+            column_totals += np.bincount(columns[1], minlength=shape[1])
+            base += int(answered.sum())
+        with np.errstate(divide='ignore', invalid='ignore'):
+            if measure == 'lift':
+                values = counts * base / np.outer(row_totals, column_totals).astype(float)
+            elif measure == 'jaccard':
+                values = counts / (row_totals[:, None] + column_totals[None, :] - counts)
+            else:
+                values = counts
+        if to_labels:
+            row_values = [self.choices[value] for value in row_values] if self.choices \
+                else row_values
+            column_values = [other.choices[value] for value in column_values] \
+                if other.choices else column_values
+        frame = pd.DataFrame(values, index=pd.Index(row_values), columns=pd.Index(column_values))
+        frame.index.name = self.label if to_labels else self.name
+        frame.columns.name = other.label if to_labels else other.name
+        return frame
 
     def get_dummy_variables(self):
         if self.choices:
-            return {self.name + '_' + choice: self.label + ': ' + self.choices[choice]
+            return {f"{self.name}_{choice}": f"{self.label}: {self.choices[choice]}"
                     for choice in self.choices}
-        return {self.name + '_' + answer: self.label + ': ' + answer
+        return {f"{self.name}_{answer}": f"{self.label}: {answer}"
                 for answer in self.get_unique_answers()}
 
     def _add_answer(self, value):
@@ -289,9 +767,14 @@ class MultipleChoiceQuestion(ChoiceQuestion):
         super(MultipleChoiceQuestion, self)._add_answer(value)
 
     def _summary(self, **kwargs):
-        flat_answers = [item for sublist in self.answers for item in sublist]
-        series = pd.Categorical(flat_answers, categories=list(self.choices), ordered=True)
-        summary_series = series.value_counts()
+        counts = Counter()
+        for chunk in self.iter_answer_chunks():
+            counts.update(answer for answer_list in chunk if answer_list
+                          for answer in answer_list)
+        categories = list(self.choices) if self.choices else sorted(counts)
+        summary_series = pd.Series([counts[choice] for choice in categories], dtype='int64',
+                                   index=pd.CategoricalIndex(categories, categories=categories,
+                                                             ordered=True))
         summary_series.name = self.label
         return summary_series
 
@@ -303,21 +786,37 @@ class MultipleChoiceQuestion(ChoiceQuestion):
                 flat_answers.extend(answer_list)
         return sorted(set(flat_answers))
 
-    def _to_series(self, answers: list, to_labels: bool):
+    def _to_series(self, answers: list, to_labels: bool, since=0):
         if to_labels:
-            answers = []
-            for answer_list in self.answers:
+            label_answers = []
+            for answer_list in answers:
                 if answer_list:
                     converted_answer_list = []
                     for answer in answer_list:
                         converted_answer = self.choices[answer] if answer is not None else None
                         converted_answer_list.append(converted_answer)
-                    answers.append(converted_answer_list)
+                    label_answers.append(converted_answer_list)
                 else:
-                    answers.append(None)
-        else:
-            answers = self.answers
-        return super(MultipleChoiceQuestion, self)._to_series(answers, to_labels)
+                    label_answers.append(None)
+            answers = label_answers
+        return super(MultipleChoiceQuestion, self)._to_series(answers, to_labels, since)
+
+    def _estimate_frame_size(self, **kwargs):
+        if kwargs['to_dummies']:
+            n_choices = len(self.choices) if self.choices else len(self.get_unique_answers())
+            return self.answer_count * n_choices * np.dtype('float64').itemsize
+        return super(MultipleChoiceQuestion, self)._estimate_frame_size(**kwargs)
+
+    @staticmethod
+    def _remap_answers(answers, mapping: dict):
+        return [[mapping.get(answer, answer) for answer in answer_list]
+                if answer_list is not None else None for answer_list in answers]
+
+    def _get_tidy_values(self, respondent, answer):
+        for choice in answer:
+            if choice is not None:
+                yield (respondent, self.name, choice,
+                       self.choices[choice] if self.choices else choice)
 
     def _get_optimized_answers(self, optimization_map: dict):
         optimized_answers = []
@@ -330,14 +829,360 @@ class MultipleChoiceQuestion(ChoiceQuestion):
 
     def _to_frame(self, **kwargs):
         if kwargs['to_dummies']:
-            return self.to_dummies(kwargs['to_labels'])
+            return self.to_dummies(kwargs['to_labels'], since=kwargs['since'],
+                                   until=kwargs['until'])
         return super(MultipleChoiceQuestion, self)._to_frame(**kwargs)
 
 
+class MatrixQuestion(ChoiceQuestion):
+    """Grid of single choice rows sharing one choice dictionary
+
+    Answers are stored as one flat array of choice positions (-1 when a row is unanswered),
+    respondent by respondent, and exported as one `<name>_<row>` column per row.
+    """
+
+    def __init__(self, name, label=None, answers=None, choices=None, rows=None, **kwargs):
+        if isinstance(rows, (list, tuple)):
+            rows = {row: row for row in rows}
+        self.rows = rows if rows else {}
+        self._row_positions = {row: nr for (nr, row) in enumerate(self.rows)}
+        self._codes = array('i')
+        self._count = 0
+        super(MatrixQuestion, self).__init__(name, label=label, answers=answers,
+                                             choices=choices)
+
+    @property
+    def answers(self):
+        return self._slice_answers(0, None)
+
+    @answers.setter
+    def answers(self, value: list):
+        self._codes = array('i')  # pylint: disable=attribute-defined-outside-init
+        self._count = 0  # pylint: disable=attribute-defined-outside-init
+        if value:
+            for item in value:
+                self._add_answer(item)
+
+    @property
+    def answer_count(self):
+        return self._count
+
+    def get_codes(self, since=0, until=None) -> 'np.ndarray':
+        """Returns answers as a respondents x rows array of choice positions, -1 if missing"""
+        width = len(self.rows)
+        start, stop, _ = slice(since, until).indices(self._count)
+        stop = max(start, stop)
+        codes = np.array(memoryview(self._codes)[start * width:stop * width], dtype=np.intc)
+        return codes.reshape(stop - start, width)
+
+    def set_storage(self, storage) -> bool:
+        """Matrix answers keep their compact in-memory code array"""
+        return False
+
+    def get_result_answer(self, result: dict):
+        if self.name in result:
+            return result[self.name]
+        answer = {row: result[self._get_column_name(row)] for row in self.rows
+                  if self._get_column_name(row) in result}
+        return answer if answer else None
+
+    def get_unique_answers(self):
+        choice_keys = list(self.choices)
+        used_codes = np.unique(self.get_codes())
+        return [choice_keys[code] for code in used_codes if code >= 0]
+
+    def get_column_metadata(self, to_dummies=False, optimize=False):
+        metadata = self.get_metadata(to_dummies, optimize)
+        return {self._get_column_name(row): {'name': self._get_column_name(row),
+                                             'label': self._get_column_label(row),
+                                             'choices': metadata['choices']}
+                for row in self.rows}
+
+    def optimize(self):
+        """Converts choice keys to numeric values; stored choice positions are unaffected"""
+        if self.data_type == int:
+            return
+        self.choices = self._get_optimized_choices(self._get_optimization_map())
+
+    def _add_answer(self, value):
+        codes = [-1] * len(self.rows)
+        if value:
+            for row, choice in value.items():
+                if row not in self._row_positions:
+                    raise ValueError(f"Row {row} unavailable in question {self.name}")
+                if choice is not None:
+                    codes[self._row_positions[row]] = self._get_choice_code(choice)
+        self._codes.extend(codes)
+        self._count += 1  # pylint: disable=attribute-defined-outside-init
+
+    def _get_choice_code(self, choice):
+        code = self._choice_codes.get(choice)
+        if code is None and isinstance(choice, str):
+            try:
+                code = self._choice_codes.get(int(choice))
+            except ValueError:
+                pass
+        if code is None:
+            raise ValueError(f"Value {choice} unavailable in question {self.name}")
+        return code
+
+    def _set_choices(self, value):
+        super(MatrixQuestion, self)._set_choices(value)
+        # pylint:disable=attribute-defined-outside-init
+        self._choice_codes = {choice: nr for (nr, choice) in enumerate(self.choices)}
+        if self.choices and all(isinstance(choice, int) for choice in self.choices):
+            self.data_type = int
+        else:
+            self.__dict__.pop('data_type', None)
+
+    def _clean_labels(self, regex):
+        super(MatrixQuestion, self)._clean_labels(regex)
+        self.rows = {row: re.sub(re.compile(regex), '', text) for (row, text) in self.rows.items()}
+
+    def _get_empty_copy(self):
+        question = super(MatrixQuestion, self)._get_empty_copy()
+        question.rows = dict(self.rows)
+        return question
+
+    def _append_answers_from(self, other, count):
+        # pylint: disable=attribute-defined-outside-init,protected-access
+        if other is None:
+            self._codes.extend([-1] * (count * len(self.rows)))
+            self._count += count
+            return
+        new_rows = [row for row in other.rows if row not in self._row_positions]
+        if new_rows:
+            codes = np.full((self._count, len(self.rows) + len(new_rows)), -1, dtype=np.intc)
+            codes[:, :len(self.rows)] = self.get_codes()
+            self.rows = {**self.rows, **{row: other.rows[row] for row in new_rows}}
+            self._row_positions = {row: nr for (nr, row) in enumerate(self.rows)}
+            self._codes = array('i', codes.ravel().tolist())
+        mapping = self._merge_choices(other.choices)
+        choice_remap = np.array([self._choice_codes[mapping.get(choice, choice)]
+                                 for choice in other.choices] + [-1], dtype=np.intc)
+        codes = np.full((other.answer_count, len(self.rows)), -1, dtype=np.intc)
+        row_positions = [self._row_positions[row] for row in other.rows]
+        codes[:, row_positions] = choice_remap[other.get_codes()]
+        self._codes.extend(codes.ravel().tolist())
+        self._count += other.answer_count
+
+    def _truncate_answers(self, count):
+        del self._codes[count * len(self.rows):]
+        self._count = count  # pylint: disable=attribute-defined-outside-init
+
+    def _slice_answers(self, start, stop):
+        choice_keys = list(self.choices)
+        rows = list(self.rows)
+        return [{row: choice_keys[code] if code >= 0 else None
+                 for (row, code) in zip(rows, codes)}
+                for codes in self.get_codes(start, stop).tolist()]
+
+    def _get_tidy_values(self, respondent, answer):
+        for row, choice in answer.items():
+            if choice is not None:
+                yield (respondent, self._get_column_name(row), choice, self.choices[choice])
+
+    def _get_storage(self):
+        return {'answers': [self._codes], 'choices': [self._choices, self.rows],
+                'derived': [self._choice_codes, self._row_positions]}
+
+    def _estimate_frame_size(self, **kwargs):
+        categories = self._get_frame_categories(**kwargs)
+        return len(self.rows) * _get_categorical_size(self.answer_count, categories)
+
+    def _get_column_name(self, row):
+        return self.name + '_' + str(row)
+
+    def _get_column_label(self, row):
+        return self.label + ': ' + self.rows[row]
+
+    def _summary(self, **kwargs):
+        codes = self.get_codes()
+        n_choices = len(self.choices)
+        offsets = np.arange(len(self.rows)) * (n_choices + 1)
+        counts = np.bincount((codes + 1 + offsets).ravel(),
+                             minlength=len(self.rows) * (n_choices + 1))
+        counts = counts.reshape(len(self.rows), n_choices + 1)[:, 1:]
+        summary_frame = pd.DataFrame(counts, index=list(self.rows.values()),
+                                     columns=self.get_choice_labels())
+        summary_frame.index.name = self.label
+        return summary_frame
+
+    def _to_frame(self, **kwargs):
+        categories = self._get_frame_categories(**kwargs)
+        codes = self.get_codes(kwargs['since'], kwargs['until'])
+        columns = {}
+        for row, position in self._row_positions.items():
+            name = self._get_column_label(row) if kwargs['to_labels'] \
+                else self._get_column_name(row)
+            columns[name] = pd.Categorical.from_codes(codes[:, position], categories=categories,
+                                                      ordered=True)
+        return pd.DataFrame(columns, index=self._get_index(codes, kwargs['since']))
+
+
+class NestedQuestion(Question):
+    """Question answered with a list of items, e.g. dynamic panels or matrices
+
+    Items of all respondents are stored together: one list per item field (scalar items go to
+    the `value` field) and an offsets array marking where each respondent's items start.
+    """
+
+    scalar_field = 'value'
+
+    def __init__(self, name, label=None, answers=None, fields=None, **kwargs):
+        self.fields = fields if fields else {}
+        super(NestedQuestion, self).__init__(name, label=label, answers=answers)
+
+    @property
+    def answers(self):
+        return self._slice_answers(0, None)
+
+    @answers.setter
+    def answers(self, value: list):
+        # pylint: disable=attribute-defined-outside-init
+        self._offsets = array('q', [0])
+        self._answered = array('b')
+        self._children = {}
+        self._scalar_items = False
+        if value:
+            for item in value:
+                self._add_answer(item)
+
+    @property
+    def answer_count(self):
+        return len(self._answered)
+
+    def set_storage(self, storage) -> bool:
+        """Nested answers keep their in-memory offsets and item columns"""
+        return False
+
+    def get_offsets(self, since=0) -> 'np.ndarray':
+        return np.array(self._offsets, dtype=np.int64)[since:]
+
+    def to_long_frame(self, to_labels=False, since=0) -> 'pd.DataFrame':
+        """Explodes answers to one row per item, with respondent and item position columns"""
+        offsets = self.get_offsets(since)
+        counts = np.diff(offsets)
+        columns = {'respondent': np.repeat(np.arange(since, since + len(counts)), counts),
+                   'item': np.arange(offsets[0], offsets[-1]) - np.repeat(offsets[:-1], counts)}
+        for field, values in self._children.items():
+            name = self.fields.get(field, field) if to_labels else field
+            columns[name] = values[offsets[0]:]
+        return pd.DataFrame(columns, index=pd.RangeIndex(offsets[-1] - offsets[0]))
+
+    def _add_answer(self, value):
+        if value is not None:
+            if not isinstance(value, (list, tuple)):
+                value = [value]
+            item_count = self._offsets[-1]
+            for item in value:
+                if not isinstance(item, dict):
+                    self._scalar_items = True  # pylint: disable=attribute-defined-outside-init
+                    item = {self.scalar_field: item}
+                for field, field_value in item.items():
+                    if field not in self._children:
+                        self._children[field] = [None] * item_count
+                    self._children[field].append(field_value)
+                item_count += 1
+                for values in self._children.values():
+                    if len(values) < item_count:
+                        values.append(None)
+            self._offsets.append(item_count)
+        else:
+            self._offsets.append(self._offsets[-1])
+        self._answered.append(value is not None)
+
+    def _append_answers_from(self, other, count):
+        # pylint: disable=attribute-defined-outside-init,protected-access
+        item_count = self._offsets[-1]
+        if other is None:
+            self._offsets.extend([item_count] * count)
+            self._answered.extend([0] * count)
+            return
+        self._offsets.extend((other.get_offsets()[1:] + item_count).tolist())
+        self._answered.extend(other._answered)
+        added_count = other._offsets[-1]
+        for field in list(self._children) + [field for field in other._children
+                                             if field not in self._children]:
+            values = self._children.setdefault(field, [None] * item_count)
+            values.extend(other._children.get(field, [None] * added_count))
+        self._scalar_items = self._scalar_items or other._scalar_items
+        self.fields = {**other.fields, **self.fields}
+
+    def _truncate_answers(self, count):
+        # pylint: disable=attribute-defined-outside-init
+        del self._answered[count:]
+        del self._offsets[count + 1:]
+        for values in self._children.values():
+            del values[self._offsets[-1]:]
+
+    def _slice_answers(self, start, stop):
+        start, stop, _ = slice(start, stop).indices(self.answer_count)
+        offsets = self._offsets[start:max(start, stop) + 1]
+        items = self._get_items(offsets[0], offsets[-1])
+        return [items[offsets[nr] - offsets[0]:offsets[nr + 1] - offsets[0]]
+                if self._answered[start + nr] else None for nr in range(len(offsets) - 1)]
+
+    def _get_tidy_values(self, respondent, answer):
+        yield (respondent, self.name, json.dumps(answer, default=str), None)
+
+    def _get_storage(self):
+        return {'answers': [self._offsets, self._answered, self._children], 'choices': [],
+                'derived': []}
+
+    def _estimate_frame_size(self, **kwargs):
+        # a list of item pointers per answered respondent, found from offsets without decoding
+        pointer_size = np.dtype(object).itemsize
+        answered_count = int(np.count_nonzero(np.frombuffer(self._answered, dtype=np.int8)))
+        return (self.answer_count * pointer_size + answered_count * sys.getsizeof([]) +
+                self._offsets[-1] * pointer_size +
+                (self.answer_count - answered_count) * sys.getsizeof(None))
+
+    def _get_items(self, start, stop):
+        if not self._children:
+            return [{} for _ in range(stop - start)]
+        if self._scalar_items and list(self._children) == [self.scalar_field]:
+            return self._children[self.scalar_field][start:stop]
+        fields = list(self._children)
+        return [{field: value for (field, value) in zip(fields, values) if value is not None}
+                for values in zip(*(values[start:stop] for values in self._children.values()))]
+
+    def _summary(self, **kwargs):
+        """Summarizes each item field over all items"""
+        summaries = {}
+        long_frame = self.to_long_frame()
+        for field in self._children:
+            values = long_frame[field].dropna()
+            numeric_values = pd.to_numeric(values, errors='coerce')
+            if len(values) and numeric_values.notna().all():
+                summary_series = numeric_values.describe()
+            else:
+                summary_series = values.astype(str).value_counts()
+            summary_series.name = self.label + ': ' + str(self.fields.get(field, field))
+            summaries[field] = summary_series
+        return summaries
+
+    def _get_metadata(self, **kwargs):
+        metadata = super(NestedQuestion, self)._get_metadata(**kwargs)
+        metadata['fields'] = self.fields
+        return metadata
+
+
 class Survey:
 
     def __init__(self, questions: list):
         self.questions = questions
+        # held while answers are added, so that readers can take it for a consistent snapshot
+        self.lock = threading.RLock()
+
+    def __getstate__(self):
+        state = dict(self.__dict__)
+        del state['lock']
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.lock = threading.RLock()
 
     @property
     def questions(self):
@@ -351,31 +1196,165 @@ class Survey:
             raise ValueError(f"Question names must be unique. Duplicate names: {duplicated_names}")
         self._questions = value  # pylint:disable=attribute-defined-outside-init
 
+    @property
+    def watermark(self):
+        """Number of respondents added so far, usable as `since` in delta exports"""
+        return self.questions[0].answer_count if self.questions else 0
+
     @classmethod
     def from_surveyjs(cls, survey_json: dict, results: list = None,
-                      default_other_text='other, which?', default_none_text='none'):
+                      default_other_text='other, which?', default_none_text='none',
+                      deduplicator=None, matrix_as_block=False, encode_text=False):
         """Builds Survey object from surveyjs' survey json and, optionally, a result set"""
-        from .io.surveyjs import MetadataParser, process_result
+        from .io.surveyjs import MetadataParser, decode_results
         metadata_parser = MetadataParser(default_other_text=default_other_text,
-                                         default_none_text=default_none_text)
+                                         default_none_text=default_none_text,
+                                         matrix_as_block=matrix_as_block,
+                                         encode_text=encode_text)
         survey = cls(questions=metadata_parser.parse(survey_json))
         if results:
-            results = [process_result(json.loads(row)) for row in results]
-            survey.add_results(*results)
+            survey.add_results(*decode_results(results), deduplicator=deduplicator)
         return survey
 
+    @classmethod
+    def concat(cls, surveys: list):
+        """Stacks respondents of several surveys, e.g. waves of the same questionnaire
+
+        Questions are aligned by name and must be of the same type in every survey; respondents
+        of surveys lacking a question get no answer to it. Choices are united and answers
+        remapped where the same choice label has different keys. Stored answers are copied
+        without validating them again.
+        """
+        # pylint: disable=protected-access
+        questions_by_survey = [{question.name: question for question in survey.questions}
+                               for survey in surveys]
+        names = []
+        for survey_questions in questions_by_survey:
+            names.extend(name for name in survey_questions if name not in names)
+        merged_questions = []
+        for name in names:
+            named_questions = [survey_questions[name] for survey_questions in questions_by_survey
+                               if name in survey_questions]
+            question_types = sorted({question.__class__.__name__
+                                     for question in named_questions})
+            if len(question_types) > 1:
+                raise ValueError(f"Question {name} has different types in concatenated "
+                                 f"surveys: {question_types}")
+            merged_question = named_questions[0]._get_empty_copy()
+            for survey, survey_questions in zip(surveys, questions_by_survey):
+                merged_question._append_answers_from(survey_questions.get(name),
+                                                     survey.watermark)
+            merged_questions.append(merged_question)
+        return cls(questions=merged_questions)
+
+    def get_question(self, name) -> Question:
+        for question in self.questions:
+            if question.name == name:
+                return question
+        raise KeyError(f"Question {name} not found")
+
+    def set_storage(self, storage) -> list:
+        """Moves answers of supporting questions to `storage`; returns names of moved questions"""
+        return [question.name for question in self.questions if question.set_storage(storage)]
+
     def add_question(self, question: Question):
         assert question.name not in [qst.name for qst in self.questions], (
             f"Question {question.name} already exists in this survey")
-        self._questions.append(question)
+        with self.lock:
+            self._questions.append(question)
 
     def add_result(self, **result):
-        for question in self.questions:
-            question.add_answer(result.get(question.name, None))
-
-    def add_results(self, *results):
-        for result in results:
-            self.add_result(**result)
+        with self.lock:
+            counts = [question.answer_count for question in self.questions]
+            try:
+                for question in self.questions:
+                    question.add_answer(question.get_result_answer(result))
+            except Exception:
+                self._truncate_answers(counts)
+                raise
+
+    def sharded_writer(self, flush_size=1000):
+        """Writer adding results from several threads; see `sharding.ShardedWriter`"""
+        from .sharding import ShardedWriter
+        return ShardedWriter(self, flush_size=flush_size)
+
+    def add_results(self, *results, deduplicator=None) -> int:
+        """Adds results, skipping those `deduplicator` reports as seen. Returns number added
+
+        Answers are added question by question, so that numeric answers are parsed in one
+        batch. If any answer is rejected, none of the results are added nor remembered by
+        `deduplicator`.
+        """
+        with self.lock:
+            if deduplicator is not None:
+                results, hashes = deduplicator.get_unseen(results)
+            counts = [question.answer_count for question in self.questions]
+            try:
+                for question in self.questions:
+                    question.add_answers([question.get_result_answer(result)
+                                          for result in results])
+            except Exception:
+                self._truncate_answers(counts)
+                raise
+            if deduplicator is not None:
+                deduplicator.remember(*hashes)
+        return len(results)
+
+    async def aconsume(self, source, batch_size=1000, max_pending=4, executor=None,
+                       deduplicator=None) -> int:
+        """Consumes raw surveyjs results from an async iterable in micro-batches
+
+        Batches are decoded in `executor` (the loop's default executor if None) while at most
+        `max_pending` batches are in flight, which applies backpressure to `source`. Decoded
+        batches are added in arrival order on the event loop thread, so the survey stays
+        queryable between batches. Returns the number of results added, which excludes results
+        rejected by `deduplicator`.
+        """
+        import asyncio
+        from .io.surveyjs import decode_results
+        if batch_size < 1 or max_pending < 1:
+            raise ValueError("batch_size and max_pending must be positive")
+        loop = asyncio.get_event_loop()
+        pending = asyncio.Queue(maxsize=max_pending)
+
+        async def produce():
+            batch = []
+            try:
+                async for row in source:
+                    batch.append(row)
+                    if len(batch) >= batch_size:
+                        await pending.put(loop.run_in_executor(executor, decode_results, batch))
+                        batch = []
+                if batch:
+                    await pending.put(loop.run_in_executor(executor, decode_results, batch))
+            except Exception:
+                await pending.put(None)
+                raise
+            await pending.put(None)
+
+        producer = asyncio.ensure_future(produce())
+        consumed = 0
+        try:
+            while True:
+                decoding = await pending.get()
+                if decoding is None:
+                    break
+                results = await decoding
+                consumed += self.add_results(*results, deduplicator=deduplicator)
+            await producer
+        finally:
+            if not producer.done():
+                producer.cancel()
+                with suppress(asyncio.CancelledError):
+                    await producer
+        return consumed
+
+    def _truncate_answers(self, counts):
+        """Drops answers added after questions had `counts` answers, e.g. of rejected results"""
+        # pylint: disable=protected-access
+        for question, count in zip(self.questions, counts):
+            if question.answer_count > count:
+                question._truncate_answers(count)
 
     def summary(self, language='en', **kwargs):
         return [question.summary(language=language, **kwargs)
@@ -389,16 +1368,208 @@ class Survey:
         for question in self.questions:
             question.clean_html_labels()
 
-    def to_pandas(self, to_labels=False, to_dummies=False, optimize=False) -> pd.DataFrame:
-        """Creates pandas DataFrame from survey data"""
-        dfs = [question.to_frame(to_labels, to_dummies, optimize) for question in self.questions]
+    def to_pandas(self, to_labels=False, to_dummies=False, optimize=False,
+                  since=0, columns=None) -> 'pd.DataFrame':
+        """Creates pandas DataFrame from survey data
+
+        With `since` set to an earlier `watermark`, only respondents added after it are exported,
+        indexed by their position in the survey and encoded the same way as the full export.
+        `columns` limits the export to the named questions, leaving others unread.
+        """
+        questions = self.questions if columns is None else \
+            [self.get_question(name) for name in columns]
+        dfs = [question.to_frame(to_labels, to_dummies, optimize, since)
+               for question in questions]
         return pd.concat(dfs, axis=1, sort=False)
 
+    def iter_frames(self, chunksize=10000, to_labels=False, to_dummies=False, optimize=False,
+                    since=0, columns=None):
+        """Yields `to_pandas` frames of up to `chunksize` respondents, starting after `since`
+
+        Every chunk has the same columns and dtypes: categoricals share the categories of the
+        full export, choice keys are optimized chunk by chunk with the same mapping and dummy
+        columns are float64, also in chunks where a choice was never selected. Categories of
+        questions without choices are found once, when iteration starts.
+        """
+        # pylint: disable=protected-access
+        questions = [question._get_export_copy() for question in
+                     (self.questions if columns is None else
+                      [self.get_question(name) for name in columns])]
+        for start in range(since, self.watermark, chunksize):
+            stop = start + chunksize
+            dfs = [question.to_frame(to_labels, to_dummies, optimize, start, stop)
+                   for question in questions]
+            yield pd.concat(dfs, axis=1, sort=False)
+
+    def crosstab(self, index, columns, to_labels=True, chunksize=10000) -> 'pd.DataFrame':
+        """Counts respondents by answers to two questions, reading answers chunk by chunk
+
+        Multiple choice answers are counted once per selected choice.
+        """
+        row_question = self.get_question(index)
+        column_question = self.get_question(columns)
+        for question in [row_question, column_question]:
+            if isinstance(question, (MatrixQuestion, NestedQuestion)):
+                raise ValueError(f"Crosstabs of question {question.name} are not supported")
+        counts = Counter()
+        for row_chunk, column_chunk in zip(row_question.iter_answer_chunks(chunksize),
+                                           column_question.iter_answer_chunks(chunksize)):
+            for row_answer, column_answer in zip(row_chunk, column_chunk):
+                if row_answer is None or column_answer is None:
+                    continue
+                for row_value in _as_list(row_answer):
+                    for column_value in _as_list(column_answer):
+                        counts[(row_value, column_value)] += 1
+        row_values = _get_crosstab_values(row_question, [key[0] for key in counts])
+        column_values = _get_crosstab_values(column_question, [key[1] for key in counts])
+        table = pd.DataFrame([[counts[(row_value, column_value)]
+                               for column_value in column_values] for row_value in row_values],
+                             index=row_values, columns=column_values, dtype='int64')
+        if to_labels:
+            table = table.rename(index=row_question.choices or None,
+                                 columns=column_question.choices or None)
+        table.index.name = row_question.label if to_labels else row_question.name
+        table.columns.name = column_question.label if to_labels else column_question.name
+        return table
+
+    def banner(self, rows, banners, weights=None, alpha=0.05, to_labels=True,
+               chunksize=10000):
+        """Crosses row questions with banner questions; see `banner.compute_banner`"""
+        from .banner import compute_banner
+        return compute_banner(self, rows, banners, weights=weights, alpha=alpha,
+                              to_labels=to_labels, chunksize=chunksize)
+
+    def iter_tidy(self, chunksize=10000, since=0):
+        """Yields lists of (respondent_id, question_name, value_code, value_label) tuples
+
+        Each list covers up to `chunksize` respondents, starting after the first `since`.
+        Multiple choice answers give one tuple per selected choice, matrix rows are named like
+        their exported columns, and missing answers are skipped.
+        """
+        for start in range(since, self.watermark, chunksize):
+            yield [row for question in self.questions
+                   for row in question.iter_tidy(start, start + chunksize)]
+
+    def to_sqlite(self, database, chunksize=10000, since=0):
+        """Writes survey to an sqlite database; see `io.sqlite.write_survey`"""
+        from .io.sqlite import write_survey
+        write_survey(self, database, chunksize=chunksize, since=since)
+
+    def memory_usage(self, deep=True, by_type=False) -> 'pd.DataFrame':
+        """Bytes held by each question, or summed per question type with `by_type`"""
+        usage = pd.DataFrame([question.memory_usage(deep) for question in self.questions],
+                             columns=['answers', 'choices', 'derived', 'total'])
+        usage.insert(0, 'type', [question.__class__.__name__ for question in self.questions])
+        if by_type:
+            return usage.groupby('type').sum()
+        return usage
+
+    def estimate_frame_size(self, to_labels=False, to_dummies=False, optimize=False) -> int:
+        """Estimates bytes of `to_pandas` output for given flags without building it"""
+        return sum(question.estimate_frame_size(to_labels, to_dummies, optimize)
+                   for question in self.questions)
+
     def get_metadata(self, to_dummies=False, optimize=False):
         metadata = {}
         for question in self.questions:
-            assert question.name not in metadata, (
-                f"Metadada for question {question.name} already collected. "
-                "Possibly the question is duplicated")
-            metadata[question.name] = question.get_metadata(to_dummies, optimize)
+            for name, column_metadata in question.get_column_metadata(to_dummies,
+                                                                      optimize).items():
+                assert name not in metadata, (
+                    f"Metadada for question {name} already collected. "
+                    "Possibly the question is duplicated")
+                metadata[name] = column_metadata
         return metadata
+
+
+_NUMBER_SEPARATORS = re.compile(r"[\s'\u00a0]")
+
+
+def _parse_number_or_nan(value):
+    try:
+        number = NumericInputQuestion.parse_value(value)
+    except ValueError:
+        return np.nan
+    return np.nan if number is None else number
+
+
+def _as_list(answer):
+    return answer if isinstance(answer, list) else [answer]
+
+
+def _get_crosstab_values(question, counted_values):
+    if getattr(question, 'choices', None):
+        return list(question.choices)
+    return sorted(set(counted_values))
+
+
+def _get_choice_csr(answers, positions):
+    """Row pointers and column indices of selected choice positions, one row per answer"""
+    lengths = []
+    indices = []
+    for answer in answers:
+        selected = [] if answer is None else \
+            [positions[value] for value in dict.fromkeys(_as_list(answer)) if value in positions]
+        lengths.append(len(selected))
+        indices.extend(selected)
+    indptr = np.zeros(len(lengths) + 1, dtype='int64')
+    np.cumsum(lengths, out=indptr[1:])
+    return indptr, np.array(indices, dtype='int64')
+
+
+def _filter_csr_rows(csr, mask):
+    indptr, indices = csr
+    lengths = np.diff(indptr)
+    kept_lengths = np.where(mask, lengths, 0)
+    kept_indptr = np.zeros_like(indptr)
+    np.cumsum(kept_lengths, out=kept_indptr[1:])
+    return kept_indptr, indices[np.repeat(mask, lengths)]
+
+
+def _count_csr_pairs(left, right, shape):
+    """Counts (left column, right column) pairs within the same rows of two CSR indicators"""
+    (left_indptr, left_indices), (right_indptr, right_indices) = left, right
+    left_rows = np.repeat(np.arange(len(left_indptr) - 1), np.diff(left_indptr))
+    repeats = np.diff(right_indptr)[left_rows]
+    pair_starts = np.repeat(right_indptr[left_rows], repeats)
+    pair_offsets = np.arange(repeats.sum()) - np.repeat(np.cumsum(repeats) - repeats, repeats)
+    pairs = np.repeat(left_indices, repeats) * shape[1] + \
+        right_indices[pair_starts + pair_offsets]
+    return np.bincount(pairs, minlength=shape[0] * shape[1]).reshape(shape)
+
+
+def _drop_store(answers):
+    """Deletes a replaced answer store from disk; in-memory lists are left to the collector"""
+    if isinstance(answers, AnswerStore):
+        answers.drop()
+
+
+def _get_object_size(obj, deep, seen):
+    if id(obj) in seen:
+        return 0
+    seen.add(id(obj))
+    if isinstance(obj, np.ndarray):
+        return obj.nbytes
+    size = sys.getsizeof(obj)
+    if deep:
+        if isinstance(obj, dict):
+            size += sum(_get_object_size(key, deep, seen) + _get_object_size(value, deep, seen)
+                        for (key, value) in obj.items())
+        elif isinstance(obj, (list, tuple, set)):
+            size += sum(_get_object_size(item, deep, seen) for item in obj)
+    return size
+
+
+def _get_object_column_size(values, sample_size=1000):
+    if not values:
+        return 0
+    step = max(len(values) // sample_size, 1)
+    sample = values[::step]
+    sample_bytes = sum(sys.getsizeof(value) for value in sample)
+    return len(values) * (np.dtype(object).itemsize + sample_bytes // len(sample))
+
+
+def _get_categorical_size(length, categories):
+    codes_dtype = np.min_scalar_type(-len(categories) - 1)
+    categories_size = sum(np.dtype(object).itemsize + sys.getsizeof(category)
+                          for category in categories)
+    return length * codes_dtype.itemsize + categories_size
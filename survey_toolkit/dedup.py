@@ -0,0 +1,106 @@
+"""Ingestion-time deduplication of survey results"""
+import json
+import sqlite3
+from hashlib import blake2b
+
+
+class ResultDeduplicator:
+    """Remembers results as 64-bit hashes and reports repeated ones
+
+    Results are keyed on the value of `key` if given (results lacking it are never treated as
+    duplicates), or on the whole flattened result otherwise. With `spill_path`, hashes beyond
+    `max_in_memory` are moved to an sqlite file, keeping the in-memory set bounded; an existing
+    file is reused, so deduplication carries over between runs.
+    """
+
+    def __init__(self, key=None, spill_path=None, max_in_memory=1000000):
+        self.key = key
+        self.spill_path = spill_path
+        self.max_in_memory = max_in_memory
+        self._seen = set()
+        self._spilled_count = 0
+        self._connection = None
+        if spill_path is not None:
+            self._connection = sqlite3.connect(spill_path)
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS seen (hash INTEGER PRIMARY KEY) WITHOUT ROWID")
+            self._spilled_count = self._connection.execute(
+                "SELECT COUNT(*) FROM seen").fetchone()[0]
+
+    def __repr__(self):
+        return f"{self.__class__.__name__}(key={self.key!r}, spill_path={self.spill_path!r})"
+
+    @property
+    def seen_count(self):
+        return len(self._seen) + self._spilled_count
+
+    def is_duplicate(self, result: dict) -> bool:
+        """Checks whether result was seen before and remembers it if not"""
+        hashed = self.get_hash(result)
+        if hashed is None:
+            return False
+        if self.is_seen(hashed):
+            return True
+        self.remember(hashed)
+        return False
+
+    def get_unseen(self, results) -> tuple:
+        """Results neither seen before nor repeated within `results`, and their hashes
+
+        Hashes are not remembered, so that results rejected later can be retried; pass them to
+        `remember` once the results are stored.
+        """
+        unseen, hashes, batch = [], [], set()
+        for result in results:
+            hashed = self.get_hash(result)
+            if hashed is not None:
+                if hashed in batch or self.is_seen(hashed):
+                    continue
+                batch.add(hashed)
+            unseen.append(result)
+            hashes.append(hashed)
+        return unseen, hashes
+
+    def get_hash(self, result: dict):
+        """Hash result is deduplicated on, None if result lacks `key`"""
+        if self.key is not None:
+            if self.key not in result:
+                return None
+            return self.hash_value(result[self.key])
+        return self.hash_value(result)
+
+    def is_seen(self, hashed: int) -> bool:
+        return hashed in self._seen or self._is_spilled(hashed)
+
+    def remember(self, *hashes):
+        """Marks hashes as seen; None hashes (results lacking `key`) are ignored"""
+        for hashed in hashes:
+            if hashed is None:
+                continue
+            self._seen.add(hashed)
+            if self._connection is not None and len(self._seen) >= self.max_in_memory:
+                self._spill()
+
+    def close(self):
+        if self._connection is not None:
+            self._connection.close()
+            self._connection = None
+
+    @staticmethod
+    def hash_value(value) -> int:
+        """Stable signed 64-bit hash of a json-serializable value"""
+        serialized = json.dumps(value, sort_keys=True, default=str).encode('utf-8')
+        return int.from_bytes(blake2b(serialized, digest_size=8).digest(), 'little', signed=True)
+
+    def _is_spilled(self, hashed):
+        if not self._spilled_count:
+            return False
+        cursor = self._connection.execute("SELECT 1 FROM seen WHERE hash = ?", (hashed,))
+        return cursor.fetchone() is not None
+
+    def _spill(self):
+        with self._connection:
+            self._connection.executemany("INSERT OR IGNORE INTO seen VALUES (?)",
+                                         ((hashed,) for hashed in self._seen))
+        self._spilled_count += len(self._seen)
+        self._seen = set()
@@ -0,0 +1,50 @@
+"""Bulk writer of survey data to sqlite"""
+# pylint: disable=cyclic-import
+import sqlite3
+
+SCHEMA = (
+    "CREATE TABLE IF NOT EXISTS questions "
+    "(name TEXT PRIMARY KEY, label TEXT, type TEXT)",
+    "CREATE TABLE IF NOT EXISTS choices "
+    "(question_name TEXT, value_code, value_label TEXT, PRIMARY KEY (question_name, value_code))",
+    "CREATE TABLE IF NOT EXISTS answers "
+    "(respondent_id INTEGER, question_name TEXT, value_code, value_label TEXT)",
+)
+
+
+def write_survey(survey, database, chunksize=10000, since=0):
+    """Writes survey to sqlite as question and choice dimension tables and tidy answers
+
+    `database` is a path or an open sqlite3 connection. Answers are streamed from
+    `Survey.iter_tidy` and inserted in one transaction per chunk of respondents, so the whole
+    dataset is never held in memory. Dimension tables are upserted, which allows appending
+    respondents added after `since`.
+    """
+    connection = database if isinstance(database, sqlite3.Connection) \
+        else sqlite3.connect(database)
+    try:
+        with connection:
+            for statement in SCHEMA:
+                connection.execute(statement)
+            connection.executemany("INSERT OR REPLACE INTO questions VALUES (?, ?, ?)",
+                                   _get_question_rows(survey))
+            connection.executemany("INSERT OR REPLACE INTO choices VALUES (?, ?, ?)",
+                                   _get_choice_rows(survey))
+        for chunk in survey.iter_tidy(chunksize=chunksize, since=since):
+            with connection:
+                connection.executemany("INSERT INTO answers VALUES (?, ?, ?, ?)", chunk)
+    finally:
+        if connection is not database:
+            connection.close()
+
+
+def _get_question_rows(survey):
+    for question in survey.questions:
+        for name, metadata in question.get_column_metadata().items():
+            yield (name, metadata['label'], question.__class__.__name__)
+
+
+def _get_choice_rows(survey):
+    for name, metadata in survey.get_metadata().items():
+        for code, label in (metadata.get('choices') or {}).items():
+            yield (name, code, label)
@@ -1,16 +1,20 @@
 """Parser for surveyjs' metadata json and result set"""
 # pylint: disable=cyclic-import,too-few-public-methods
+import json
 from typing import List
-from ..core import (Question, SingleChoiceQuestion, MultipleChoiceQuestion,
-                    NumericInputQuestion, TextInputQuestion)
+from ..core import (Question, SingleChoiceQuestion, MultipleChoiceQuestion, MatrixQuestion,
+                    NestedQuestion, NumericInputQuestion, TextInputQuestion)
 
 
 class MetadataParser:  # pylint: disable=too-few-public-methods
     """Parser of metadata from surveyjs' survey json"""
 
-    def __init__(self, default_other_text, default_none_text):
+    def __init__(self, default_other_text, default_none_text, matrix_as_block=False,
+                 encode_text=False):
         self.default_other_text = default_other_text
         self.default_none_text = default_none_text
+        self.matrix_as_block = matrix_as_block
+        self.encode_text = encode_text
         self.question_list = []
         self.name_stack = []
         self.label_stack = []
@@ -36,20 +40,16 @@ class MetadataParser:  # pylint: disable=too-few-public-methods
             self.name_stack.append(metadata['name'])
             self.label_stack.append(metadata.get('title', ''))
             for item in metadata['items']:
-                item['type'] = 'text'
-                self._handle_question(**item)
+                self._handle_question(**dict(item, type='text'))
             self.name_stack.pop()
             self.label_stack.pop()
-        elif metadata['type'] == 'matrix':
+        elif metadata['type'] == 'matrix' and not self.matrix_as_block:
             self.name_stack.append(metadata['name'])
             self.label_stack.append(metadata.get('title', ''))
-            metadata['choices'] = metadata['columns']
-            metadata['rows'] = _parse_value_text_list(metadata['rows'])
-            metadata['type'] = 'radiogroup'
-            for row in metadata['rows']:
-                metadata['name'] = row
-                metadata['title'] = metadata['rows'][row]
-                self._handle_question(**metadata)
+            rows = _parse_value_text_list(metadata['rows'])
+            for row, row_label in rows.items():
+                self._handle_question(**dict(metadata, choices=metadata['columns'], rows=rows,
+                                             type='radiogroup', name=row, title=row_label))
             self.name_stack.pop()
             self.label_stack.pop()
         elif metadata['type'] == 'html':
@@ -64,6 +64,7 @@ class MetadataParser:  # pylint: disable=too-few-public-methods
             metadata['title'] = ': '.join(self.label_stack) + ': ' + metadata.get('title', '')
         metadata['defaultOtherText'] = self.default_other_text
         metadata['defaultNoneText'] = self.default_none_text
+        metadata['encodeText'] = self.encode_text
         question_parser = get_question_parser(**metadata)
         self.question_list.extend(question_parser.parse())
 
@@ -87,10 +88,25 @@ class QuestionParser:
         return [self.question_class(**self.__dict__)]
 
 
+class NestedQuestionParser(QuestionParser):
+    """Surveyjs paneldynamic, matrixdynamic and sortablelist question parser"""
+    question_class = NestedQuestion
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        elements = kwargs.get('templateElements', kwargs.get('columns', []))
+        self.fields = {element['name']: element.get('title', element['name'])
+                       for element in elements}
+
+
 class TextQuestionParser(QuestionParser):
     """Surveyjs text question parser"""
     question_class = TextInputQuestion
 
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.dictionary_encoded = kwargs.get('encodeText', False)
+
 
 class NumericQuuestionParser(QuestionParser):
     """Surveyjs numeric question parser"""
@@ -116,6 +132,16 @@ class RadiogroupQuestionParser(QuestionParser):
         return super()._parse()
 
 
+class MatrixQuestionParser(QuestionParser):
+    """Surveyjs matrix question parser, keeping the whole grid in one question"""
+    question_class = MatrixQuestion
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.choices = _parse_value_text_list(kwargs['columns'])
+        self.rows = _parse_value_text_list(kwargs['rows'])
+
+
 class CheckboxQuestionParser(RadiogroupQuestionParser):
     """Surveyjs checkbox question parser"""
     question_class = MultipleChoiceQuestion
@@ -133,6 +159,8 @@ def get_question_parser(**kwargs) -> QuestionParser:
         return RadiogroupQuestionParser(**kwargs)
     if _type == 'checkbox':
         return CheckboxQuestionParser(**kwargs)
+    if _type == 'matrix':
+        return MatrixQuestionParser(**kwargs)
     if _type == 'text':
         validators = kwargs.get('validators', [])
         if (kwargs.get('inputType') == 'number') or\
@@ -140,7 +168,7 @@ def get_question_parser(**kwargs) -> QuestionParser:
             return NumericQuuestionParser(**kwargs)
         return TextQuestionParser(**kwargs)
     if _type in ['paneldynamic', 'matrixdynamic', 'sortablelist']:
-        return QuestionParser(**kwargs)
+        return NestedQuestionParser(**kwargs)
     raise NotImplementedError(f"Cannot get parser for {_type}")
 
 
@@ -156,6 +184,12 @@ def process_result(result: dict):
     return target
 
 
+def decode_results(rows) -> list:
+    """Decodes a batch of raw surveyjs results (json strings or dicts)"""
+    return [process_result(json.loads(row) if isinstance(row, (str, bytes)) else row)
+            for row in rows]
+
+
 def _parse_value_text_list(choices: list) -> dict:
     parsed_choices = {}
     for choice in choices:
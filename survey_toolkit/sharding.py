@@ -0,0 +1,133 @@
+"""Concurrent ingestion of survey results from several producer threads"""
+# pylint: disable=protected-access
+import threading
+from copy import copy
+
+
+class ShardedWriter:
+    """Adds results to a survey from several threads at once
+
+    Each thread validates and encodes its results into a private shard of empty question
+    copies, without locking. Shards are appended to the survey every `flush_size` results, on
+    `flush` from the owning thread and on `close`, all questions at once under the survey's
+    lock, so answers of every question stay aligned by respondent. A result rejected by a
+    question is removed from the whole shard before the error is raised, and is not remembered
+    by a deduplicator, so it can be retried. Respondents of different threads are interleaved
+    shard by shard.
+    """
+
+    def __init__(self, survey, flush_size=1000):
+        if flush_size < 1:
+            raise ValueError("flush_size must be positive")
+        self.survey = survey
+        self.flush_size = flush_size
+        self._local = threading.local()
+        self._shards = []
+        self._pending = set()
+        self._lock = threading.Lock()
+
+    def __repr__(self):
+        return f"{self.__class__.__name__}(flush_size={self.flush_size})"
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def add_result(self, **result):
+        shard = self._get_shard()
+        shard.add(result)
+        if shard.count >= self.flush_size:
+            self._flush_shard(shard)
+
+    def add_results(self, *results, deduplicator=None) -> int:
+        """Adds results, skipping those `deduplicator` reports as seen. Returns number added"""
+        added = 0
+        for result in results:
+            if deduplicator is None:
+                self.add_result(**result)
+            elif not self._add_unseen_result(result, deduplicator):
+                continue
+            added += 1
+        return added
+
+    def flush(self):
+        """Appends results buffered by the calling thread to the survey"""
+        shard = getattr(self._local, 'shard', None)
+        if shard is not None:
+            self._flush_shard(shard)
+
+    def close(self):
+        """Appends results buffered by all threads; call once producers are done"""
+        with self._lock:
+            shards = list(self._shards)
+        for shard in shards:
+            self._flush_shard(shard)
+
+    def _add_unseen_result(self, result, deduplicator):
+        """Adds result unless seen or being added by another thread; remembers it once added"""
+        hashed = deduplicator.get_hash(result)
+        if hashed is None:
+            self.add_result(**result)
+            return True
+        with self._lock:
+            if hashed in self._pending or deduplicator.is_seen(hashed):
+                return False
+            self._pending.add(hashed)
+        try:
+            self.add_result(**result)
+            with self._lock:
+                deduplicator.remember(hashed)
+        finally:
+            with self._lock:
+                self._pending.discard(hashed)
+        return True
+
+    def _get_shard(self):
+        shard = getattr(self._local, 'shard', None)
+        if shard is None:
+            shard = self._local.shard = _Shard(self.survey.questions)
+            with self._lock:
+                self._shards.append(shard)
+        return shard
+
+    def _flush_shard(self, shard):
+        questions, count = shard.take()
+        if not count:
+            return
+        with self.survey.lock:
+            for question in self.survey.questions:
+                question._append_answers_from(questions.get(question.name), count)
+
+
+class _Shard:
+    """Results of one thread kept in in-memory question copies, keyed by question name"""
+
+    def __init__(self, questions):
+        self._templates = list(questions)
+        self.questions, self.count = self._get_empty_questions(), 0
+
+    def add(self, result):
+        try:
+            for question in self.questions.values():
+                question.add_answer(question.get_result_answer(result))
+        except Exception:
+            for question in self.questions.values():
+                question._truncate_answers(self.count)
+            raise
+        self.count += 1
+
+    def take(self):
+        """Returns buffered questions and their answer count, starting a new buffer"""
+        taken = self.questions, self.count
+        self.questions, self.count = self._get_empty_questions(), 0
+        return taken
+
+    def _get_empty_questions(self):
+        questions = {}
+        for template in self._templates:
+            question = copy(template)
+            question.storage = None
+            questions[question.name] = question._get_empty_copy()
+        return questions
@@ -0,0 +1,227 @@
+"""On-disk answer storage for surveys that do not fit in memory
+
+A storage creates one answer store per question. Stores behave like the answer lists questions
+keep by default (append, extend, len, indexing, slicing and iteration), keep at most
+`buffer_size` answers in memory and write the rest to disk.
+"""
+import itertools
+import json
+import os
+import sqlite3
+import sys
+import threading
+from contextlib import suppress
+from ._lazy import LazyModule
+
+np = LazyModule('numpy')
+
+
+class AnswerStore:
+    """Buffered list-like answer store; subclasses write and read flushed answers"""
+
+    def __init__(self, buffer_size=10000):
+        self.buffer_size = buffer_size
+        self._buffer = []
+        self._flushed_count = 0
+
+    def __repr__(self):
+        return f"{self.__class__.__name__}(length={len(self)})"
+
+    def __len__(self):
+        return self._flushed_count + len(self._buffer)
+
+    def __sizeof__(self):
+        return object.__sizeof__(self) + sys.getsizeof(self._buffer)
+
+    def __iter__(self):
+        for chunk in self.iter_chunks():
+            yield from chunk
+
+    def __getitem__(self, key):
+        if isinstance(key, slice):
+            start, stop, step = key.indices(len(self))
+            if step != 1:
+                return [self[position] for position in range(start, stop, step)]
+            return self._get_range(start, max(start, stop))
+        position = key + len(self) if key < 0 else key
+        if not 0 <= position < len(self):
+            raise IndexError("answer store index out of range")
+        return self._get_range(position, position + 1)[0]
+
+    def __delitem__(self, key):
+        if not isinstance(key, slice) or key.stop is not None or key.step not in (None, 1):
+            raise TypeError("answer stores only support deleting trailing answers")
+        count, _, _ = key.indices(len(self))
+        if count < self._flushed_count:
+            self._truncate(count)
+            self._flushed_count = count
+            self._buffer = []
+        else:
+            del self._buffer[count - self._flushed_count:]
+
+    def append(self, value):
+        self._buffer.append(value)
+        if len(self._buffer) >= self.buffer_size:
+            self.flush()
+
+    def extend(self, values):
+        values = iter(values)
+        while True:
+            chunk = list(itertools.islice(values, self.buffer_size - len(self._buffer)))
+            if not chunk:
+                return
+            self._buffer.extend(chunk)
+            if len(self._buffer) >= self.buffer_size:
+                self.flush()
+
+    def flush(self):
+        if self._buffer:
+            self._write(self._buffer)
+            self._flushed_count += len(self._buffer)
+            self._buffer = []
+
+    def iter_chunks(self, chunksize=None):
+        chunksize = chunksize or self.buffer_size
+        for start in range(0, len(self), chunksize):
+            yield self._get_range(start, min(start + chunksize, len(self)))
+
+    def _get_range(self, start, stop):
+        flushed_stop = min(stop, self._flushed_count)
+        values = self._read(start, flushed_stop) if start < flushed_stop else []
+        buffer_start = max(start - self._flushed_count, 0)
+        return values + self._buffer[buffer_start:max(stop - self._flushed_count, 0)]
+
+    def drop(self):
+        """Deletes answers with their table or file; the store cannot be used afterwards"""
+        self._drop()
+        self._buffer = []
+        self._flushed_count = 0
+
+    def _write(self, values):
+        raise NotImplementedError
+
+    def _read(self, start, stop):
+        raise NotImplementedError
+
+    def _truncate(self, count):
+        raise NotImplementedError
+
+    def _drop(self):
+        raise NotImplementedError
+
+
+class SQLiteAnswerStore(AnswerStore):
+    """Answer store keeping json-encoded answers in an sqlite table"""
+
+    def __init__(self, connection, table, lock, buffer_size=10000):
+        super().__init__(buffer_size)
+        self._connection = connection
+        self._table = table
+        self._lock = lock
+        with self._lock, self._connection:
+            self._connection.execute(f"CREATE TABLE {table} (value TEXT)")
+
+    def _write(self, values):
+        with self._lock, self._connection:
+            self._connection.executemany(f"INSERT INTO {self._table} (rowid, value) VALUES (?, ?)",
+                                         zip(itertools.count(self._flushed_count + 1),
+                                             map(json.dumps, values)))
+
+    def _read(self, start, stop):
+        with self._lock:
+            rows = self._connection.execute(
+                f"SELECT value FROM {self._table} WHERE rowid > ? AND rowid <= ? ORDER BY rowid",
+                (start, stop)).fetchall()
+        return [json.loads(value) for (value,) in rows]
+
+    def _truncate(self, count):
+        with self._lock, self._connection:
+            self._connection.execute(f"DELETE FROM {self._table} WHERE rowid > ?", (count,))
+
+    def _drop(self):
+        with self._lock, self._connection:
+            self._connection.execute(f"DROP TABLE IF EXISTS {self._table}")
+
+
+class MemmapAnswerStore(AnswerStore):
+    """Answer store appending numeric answers to a raw file read back as a numpy memmap
+
+    Missing answers are stored as NaN.
+    """
+
+    def __init__(self, path, dtype='float64', buffer_size=10000):
+        super().__init__(buffer_size)
+        self.path = path
+        self.dtype = np.dtype(dtype)
+        open(path, 'wb').close()
+
+    def get_array(self) -> 'np.ndarray':
+        """Returns flushed answers as a read-only memmap, NaN for missing ones"""
+        if not self._flushed_count:
+            return np.empty(0, dtype=self.dtype)
+        return np.memmap(self.path, dtype=self.dtype, mode='r', shape=(self._flushed_count,))
+
+    def _write(self, values):
+        with open(self.path, 'ab') as file:
+            np.array([np.nan if value is None else value for value in values],
+                     dtype=self.dtype).tofile(file)
+
+    def _read(self, start, stop):
+        values = self.get_array()[start:stop].tolist()
+        return [None if value != value else value for value in values]
+
+    def _truncate(self, count):
+        os.truncate(self.path, count * self.dtype.itemsize)
+
+    def _drop(self):
+        with suppress(FileNotFoundError):
+            os.remove(self.path)
+
+
+class SQLiteStorage:
+    """Keeps answers of each question in its own table of one sqlite file"""
+
+    def __init__(self, path, buffer_size=10000):
+        self.path = path
+        self.buffer_size = buffer_size
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        self._lock = threading.Lock()
+        self._table_numbers = itertools.count()
+
+    def __repr__(self):
+        return f"{self.__class__.__name__}(path={self.path!r})"
+
+    def create(self, question):  # pylint: disable=unused-argument
+        table = f"answers_{next(self._table_numbers)}"
+        while self._connection.execute("SELECT 1 FROM sqlite_master WHERE name = ?",
+                                       (table,)).fetchone():
+            table = f"answers_{next(self._table_numbers)}"
+        return SQLiteAnswerStore(self._connection, table, self._lock, self.buffer_size)
+
+    def close(self):
+        self._connection.close()
+
+
+class MemmapStorage:
+    """Keeps numeric answers in memory-mapped files of a directory
+
+    Non-numeric questions are not supported and keep their answers in memory.
+    """
+
+    def __init__(self, directory, dtype='float64', buffer_size=10000):
+        self.directory = directory
+        self.dtype = dtype
+        self.buffer_size = buffer_size
+        self._file_numbers = itertools.count()
+        os.makedirs(directory, exist_ok=True)
+
+    def __repr__(self):
+        return f"{self.__class__.__name__}(directory={self.directory!r})"
+
+    def create(self, question):
+        if question.data_type is not float:
+            return None
+        path = os.path.join(self.directory, f"{question.name}-{next(self._file_numbers)}.bin")
+        while os.path.exists(path):
+            path = os.path.join(self.directory, f"{question.name}-{next(self._file_numbers)}.bin")
+        return MemmapAnswerStore(path, self.dtype, self.buffer_size)
@@ -0,0 +1,68 @@
+# pylint:disable=missing-docstring,redefined-outer-name
+import math
+import pytest
+import numpy as np
+from survey_toolkit.core import (Survey, SingleChoiceQuestion, MultipleChoiceQuestion,
+                                 NumericInputQuestion, MatrixQuestion)
+
+
+@pytest.fixture()
+def survey():
+    survey = Survey([SingleChoiceQuestion('q', 'Do you agree?', choices={1: 'Yes', 2: 'No'}),
+                     MultipleChoiceQuestion('m', choices={'a': 'Apple', 'b': 'Banana'}),
+                     SingleChoiceQuestion('g', 'Gender', choices={'f': 'Female', 'm': 'Male'}),
+                     NumericInputQuestion('w')])
+    answers = [(1, ['a'], 'f')] * 30 + [(2, ['a', 'b'], 'f')] * 10 + \
+        [(1, ['b'], 'm')] * 15 + [(2, None, 'm')] * 25 + [(None, ['a'], None)] * 5
+    for q_answer, m_answer, g_answer in answers:
+        survey.add_result(q=q_answer, m=m_answer, g=g_answer, w=1)
+    return survey
+
+
+def test_banner_counts_match_crosstabs(survey):
+    table = survey.banner(['q', 'm'], ['g'], to_labels=False, chunksize=7)
+    for row in ['q', 'm']:
+        crosstab = survey.crosstab(row, 'g', to_labels=False)
+        assert table.counts.loc[row].values.tolist() == crosstab.values.tolist()
+    assert table.bases.loc['q'].tolist() == [40, 40]
+    assert table.bases.loc['m'].tolist() == [40, 15]
+    assert table.percentages.loc[('m', 'b')].tolist() == pytest.approx([25, 100])
+
+
+def test_banner_uses_labels(survey):
+    table = survey.banner(['q'], ['g'])
+    assert table.counts.index.tolist() == [('Do you agree?', 'Yes'), ('Do you agree?', 'No')]
+    assert table.counts.columns.tolist() == [('Gender', 'Female'), ('Gender', 'Male')]
+    assert table.letters.tolist() == ['A', 'B']
+
+
+def test_banner_flags_significant_differences(survey):
+    table = survey.banner(['q'], ['g'])
+    assert table.significance.values.tolist() == [['B', ''], ['', 'A']]
+    yes_female, yes_male = 30 / 40, 15 / 40
+    pooled = 45 / 80
+    z_score = (yes_female - yes_male) / math.sqrt(pooled * (1 - pooled) * (1 / 40 + 1 / 40))
+    assert table.residuals.values[0].tolist() == pytest.approx([z_score, -z_score])
+    assert table.critical_value == pytest.approx(1.959964)
+
+
+def test_banner_weights_use_effective_bases(survey):
+    weights = np.where(np.arange(survey.watermark) % 2, 3.0, 1.0)
+    table = survey.banner(['q'], ['g'], weights=weights)
+    unweighted = survey.banner(['q'], ['g'])
+    assert table.bases.values[0].tolist() == [80, 80]
+    assert table.effective_bases.values[0].tolist() == pytest.approx([32, 32])
+    assert (abs(table.residuals.values) < abs(unweighted.residuals.values)).all()
+
+
+def test_banner_reads_weights_from_question(survey):
+    table = survey.banner(['q'], ['g'], weights='w')
+    assert table.counts.equals(survey.banner(['q'], ['g']).counts)
+
+
+def test_banner_raises_on_unsupported_question(survey):
+    survey.add_question(MatrixQuestion('grid', choices=[1, 2], rows=['x', 'y']))
+    with pytest.raises(ValueError):
+        survey.banner(['grid'], ['g'])
+    with pytest.raises(ValueError):
+        survey.banner(['q'], ['g'], weights=[1, 2])
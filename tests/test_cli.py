@@ -0,0 +1,132 @@
+# pylint:disable=missing-docstring,redefined-outer-name
+import json
+import subprocess
+import sys
+import pytest
+import pandas as pd
+from survey_toolkit.cli import main
+
+SURVEY_JSON = {"pages": [{"name": "page1", "elements": [
+    {"type": "radiogroup", "name": "gender", "choices": ["male", "female"]},
+    {"type": "checkbox", "name": "phones", "choices": ["iPhone", "Nokia"]},
+    {"type": "text", "name": "age", "inputType": "number"},
+]}]}
+
+
+@pytest.fixture
+def paths(tmp_path):
+    survey_path = tmp_path / 'survey.json'
+    survey_path.write_text(json.dumps(SURVEY_JSON))
+    results = [{"gender": "male", "phones": ["Nokia"], "age": 20}, {"gender": "female"}, {},
+               {"phones": ["iPhone", "Nokia"], "age": "35,5"}, {"gender": "male"}]
+    results_path = tmp_path / 'results.ndjson'
+    results_path.write_text('\n'.join(json.dumps(result) for result in results) + '\n')
+    return str(survey_path), str(results_path), tmp_path
+
+
+@pytest.mark.parametrize('workers', [1, 2])
+def test_convert_to_csv_in_chunks(paths, workers):
+    survey_path, results_path, tmp_path = paths
+    output = str(tmp_path / 'out.csv')
+    assert main(['convert', survey_path, results_path, output, '--to-dummies', '--optimize',
+                 '--chunk-size', '2', '--workers', str(workers)]) == 0
+    frame = pd.read_csv(output)
+    assert list(frame.columns) == ['gender', 'phones_iPhone', 'phones_Nokia', 'age']
+    assert frame['gender'].tolist()[::4] == [1, 1]
+    assert frame['age'].tolist()[::3] == [20, 35.5]
+    assert len(frame) == 5
+
+
+def test_convert_selected_columns_with_progress(paths, capsys):
+    survey_path, results_path, tmp_path = paths
+    output = str(tmp_path / 'out.txt')
+    assert main(['convert', survey_path, results_path, output, '--format', 'csv',
+                 '--columns', 'age,gender', '--to-labels', '--progress']) == 0
+    frame = pd.read_csv(output)
+    assert list(frame.columns) == ['age', 'gender']
+    assert frame['gender'].tolist()[:2] == ['male', 'female']
+    assert 'results/s' in capsys.readouterr().err
+
+
+def test_convert_to_parquet(paths):
+    pytest.importorskip('pyarrow')
+    survey_path, results_path, tmp_path = paths
+    output = str(tmp_path / 'out.parquet')
+    assert main(['convert', survey_path, results_path, output, '--chunk-size', '2']) == 0
+    assert len(pd.read_parquet(output)) == 5
+
+
+def test_convert_to_sav_with_value_labels(paths):
+    pyreadstat = pytest.importorskip('pyreadstat')
+    survey_path, results_path, tmp_path = paths
+    output = str(tmp_path / 'out.sav')
+    assert main(['convert', survey_path, results_path, output, '--optimize', '--to-dummies',
+                 '--chunk-size', '2']) == 0
+    frame, metadata = pyreadstat.read_sav(output)
+    assert len(frame) == 5
+    assert frame['gender'].tolist()[:2] == [1, 2]
+    assert metadata.variable_value_labels['gender'] == {1: 'male', 2: 'female'}
+
+
+def test_convert_to_parquet_with_question_unanswered_in_first_chunk(tmp_path):
+    pytest.importorskip('pyarrow')
+    survey_path = tmp_path / 'survey.json'
+    survey_path.write_text(json.dumps({"pages": [{"name": "page1", "elements": [
+        {"type": "text", "name": "opinion"},
+        {"type": "text", "name": "nickname"},
+        {"type": "checkbox", "name": "phones", "choices": ["iPhone", "Nokia"]},
+        {"type": "paneldynamic", "name": "kids",
+         "templateElements": [{"type": "text", "name": "age"}]},
+    ]}]}))
+    results = [{"nickname": "a"}, {"nickname": "b"},
+               {"opinion": "fine", "phones": ["Nokia"], "kids": [{"age": 3}]}, {}]
+    results_path = tmp_path / 'results.ndjson'
+    results_path.write_text('\n'.join(json.dumps(result) for result in results))
+    output = str(tmp_path / 'out.parquet')
+    assert main(['convert', str(survey_path), str(results_path), output,
+                 '--chunk-size', '2']) == 0
+    frame = pd.read_parquet(output)
+    assert frame['opinion'].tolist() == [None, None, 'fine', None]
+    assert list(frame['phones'][2]) == ['Nokia']
+    assert json.loads(frame['kids'][2]) == [{'age': 3}]
+
+
+@pytest.mark.parametrize('output_format', ['csv', 'parquet'])
+def test_convert_matrix_question_in_chunks(tmp_path, output_format):
+    if output_format == 'parquet':
+        pytest.importorskip('pyarrow')
+    survey_path = tmp_path / 'survey.json'
+    survey_path.write_text(json.dumps({"pages": [{"name": "page1", "elements": [
+        {"type": "matrix", "name": "cars", "columns": ["bad", "good"],
+         "rows": ["peugeot", "skoda"]},
+    ]}]}))
+    results = [{"cars": {"peugeot": "bad"}}, {}, {"cars": {"skoda": "good"}}]
+    results_path = tmp_path / 'results.ndjson'
+    results_path.write_text('\n'.join(json.dumps(result) for result in results))
+    output = str(tmp_path / f'out.{output_format}')
+    assert main(['convert', str(survey_path), str(results_path), output,
+                 '--chunk-size', '1']) == 0
+    frame = pd.read_csv(output) if output_format == 'csv' else pd.read_parquet(output)
+    assert list(frame.columns) == ['cars_peugeot', 'cars_skoda']
+    assert frame['cars_skoda'].astype(object).tolist()[2] == 'good'
+
+
+def test_convert_to_sav_with_labels_keeps_names(paths):
+    pyreadstat = pytest.importorskip('pyreadstat')
+    survey_path, results_path, tmp_path = paths
+    output = str(tmp_path / 'out.sav')
+    assert main(['convert', survey_path, results_path, output, '--optimize', '--to-dummies',
+                 '--to-labels']) == 0
+    frame, metadata = pyreadstat.read_sav(output)
+    assert list(frame.columns) == ['gender', 'phones_iPhone', 'phones_Nokia', 'age']
+    assert metadata.column_names_to_labels['phones_Nokia'] == 'phones: Nokia'
+    assert metadata.variable_value_labels['gender'] == {1: 'male', 2: 'female'}
+
+
+def test_module_runs_as_script(paths):
+    survey_path, results_path, tmp_path = paths
+    output = str(tmp_path / 'out.csv')
+    completed = subprocess.run([sys.executable, '-m', 'survey_toolkit.cli', 'convert',
+                                survey_path, results_path, output], check=False)
+    assert completed.returncode == 0
+    assert len(pd.read_csv(output)) == 5
@@ -0,0 +1,54 @@
+# pylint:disable=missing-docstring,redefined-outer-name
+import pytest
+from survey_toolkit.core import Survey, NumericInputQuestion, TextInputQuestion
+from survey_toolkit.dedup import ResultDeduplicator
+
+
+def test_is_duplicate_by_whole_result():
+    deduplicator = ResultDeduplicator()
+    assert not deduplicator.is_duplicate({'a': 1, 'b': [1, 2]})
+    assert deduplicator.is_duplicate({'b': [1, 2], 'a': 1})
+    assert not deduplicator.is_duplicate({'a': 2, 'b': [1, 2]})
+    assert deduplicator.seen_count == 2
+
+
+def test_is_duplicate_by_key():
+    deduplicator = ResultDeduplicator(key='id')
+    assert not deduplicator.is_duplicate({'id': 'r1', 'a': 1})
+    assert deduplicator.is_duplicate({'id': 'r1', 'a': 2})
+    assert not deduplicator.is_duplicate({'a': 1})
+    assert not deduplicator.is_duplicate({'a': 1})
+
+
+def test_is_duplicate_after_spill(tmp_path):
+    spill_path = str(tmp_path / 'seen.sqlite')
+    deduplicator = ResultDeduplicator(key='id', spill_path=spill_path, max_in_memory=2)
+    for nr in range(5):
+        assert not deduplicator.is_duplicate({'id': nr})
+    assert deduplicator.seen_count == 5
+    assert len(deduplicator._seen) < 2  # pylint:disable=protected-access
+    assert all(deduplicator.is_duplicate({'id': nr}) for nr in range(5))
+    deduplicator.close()
+    reopened = ResultDeduplicator(key='id', spill_path=spill_path)
+    assert reopened.is_duplicate({'id': 0})
+    reopened.close()
+
+
+def test_add_results_drops_duplicates():
+    survey = Survey([TextInputQuestion('city')])
+    deduplicator = ResultDeduplicator()
+    assert survey.add_results({'city': 'Lodz'}, {'city': 'Lodz'}, {'city': 'Gdansk'},
+                              deduplicator=deduplicator) == 2
+    assert survey.add_results({'city': 'Gdansk'}, deduplicator=deduplicator) == 0
+    assert survey.questions[0].answers == ['Lodz', 'Gdansk']
+
+
+def test_add_results_retries_rejected_batch():
+    survey = Survey([NumericInputQuestion('id'), NumericInputQuestion('age')])
+    deduplicator = ResultDeduplicator(key='id')
+    with pytest.raises(ValueError):
+        survey.add_results({'id': 1, 'age': 'old'}, deduplicator=deduplicator)
+    assert deduplicator.seen_count == 0
+    assert survey.add_results({'id': 1, 'age': 30}, {'id': 1, 'age': 31},
+                              deduplicator=deduplicator) == 1
+    assert survey.get_question('age').answers == [30]
@@ -0,0 +1,53 @@
+# pylint:disable=missing-docstring
+import subprocess
+import sys
+
+HEAVY_MODULES = {'numpy', 'pandas', 'many_stop_words'}
+IMPORT_TIME_BUDGET_US = 200000
+
+
+def _run_python(code):
+    process = subprocess.run([sys.executable, '-X', 'importtime', '-c', code],
+                             stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+                             universal_newlines=True, check=True)
+    import_times = {}
+    for line in process.stderr.splitlines():
+        if line.startswith('import time:'):
+            _, cumulative, module = line[len('import time:'):].split('|')
+            if cumulative.strip().isdigit():
+                import_times[module.strip()] = int(cumulative)
+    return process.stdout, import_times
+
+
+def test_import_does_not_load_heavy_dependencies():
+    _, import_times = _run_python('import survey_toolkit.io.surveyjs')
+    assert not HEAVY_MODULES & set(import_times)
+    assert import_times['survey_toolkit.io.surveyjs'] < IMPORT_TIME_BUDGET_US
+
+
+def test_parsing_metadata_does_not_load_heavy_dependencies():
+    code = (
+        "import sys\n"
+        "from survey_toolkit.core import Survey\n"
+        "survey_json = {'pages': [{'name': 'p', 'elements': [\n"
+        "    {'type': 'radiogroup', 'name': 'q', 'choices': ['a', 'b']},\n"
+        "    {'type': 'matrix', 'name': 'm', 'columns': ['1', '2'], 'rows': ['r']}]}]}\n"
+        "survey = Survey.from_surveyjs(survey_json, ['{\"q\": \"a\"}'], matrix_as_block=True)\n"
+        "survey.get_metadata(optimize=True)\n"
+        "print(sorted(set(sys.modules) & %r))\n" % HEAVY_MODULES
+    )
+    output, _ = _run_python(code)
+    assert output.strip() == '[]'
+
+
+def test_pandas_is_loaded_on_first_use():
+    code = (
+        "import sys\n"
+        "from survey_toolkit.core import Survey, NumericInputQuestion\n"
+        "survey = Survey([NumericInputQuestion('age', answers=[20])])\n"
+        "print('pandas' in sys.modules, end=' ')\n"
+        "survey.to_pandas()\n"
+        "print('pandas' in sys.modules)\n"
+    )
+    output, _ = _run_python(code)
+    assert output.strip() == 'False True'
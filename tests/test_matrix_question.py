@@ -0,0 +1,84 @@
+# pylint:disable=missing-docstring,redefined-outer-name
+import pytest
+import pandas as pd
+from pandas.testing import assert_frame_equal
+from survey_toolkit.core import MatrixQuestion, Survey
+
+
+@pytest.fixture
+def question():
+    return MatrixQuestion('carRatings', 'How do you rate these cars?',
+                          choices={'1': 'Bad', '2': 'So so', '3': 'Good'},
+                          rows={'peugeot': 'Peugeot', 'skoda': 'Skoda'})
+
+
+def test_add_answer(question):
+    question.add_answer({'peugeot': '1', 'skoda': 3})
+    question.add_answer({'skoda': '2'})
+    question.add_answer(None)
+    assert question.answers == [{'peugeot': 1, 'skoda': 3}, {'peugeot': None, 'skoda': 2},
+                                {'peugeot': None, 'skoda': None}]
+    assert question.get_codes().tolist() == [[0, 2], [-1, 1], [-1, -1]]
+
+
+def test_add_answer_not_in_choices(question):
+    with pytest.raises(ValueError):
+        question.add_answer({'peugeot': '4'})
+
+
+def test_add_answer_not_in_rows(question):
+    with pytest.raises(ValueError):
+        question.add_answer({'audi': '1'})
+
+
+def test_get_result_answer_from_flattened_result(question):
+    result = {'carRatings_peugeot': '1', 'other': 'x'}
+    assert question.get_result_answer(result) == {'peugeot': '1'}
+    assert question.get_result_answer({}) is None
+
+
+def test_to_frame(question):
+    question.answers = [{'peugeot': 1, 'skoda': 3}, {'skoda': 2}]
+    frame = question.to_frame()
+    expected = pd.DataFrame({
+        'carRatings_peugeot': pd.Categorical([1, None], categories=[1, 2, 3], ordered=True),
+        'carRatings_skoda': pd.Categorical([3, 2], categories=[1, 2, 3], ordered=True),
+    })
+    assert_frame_equal(frame, expected)
+
+
+def test_to_frame_with_labels(question):
+    question.answers = [{'peugeot': 1, 'skoda': 3}, {'skoda': 2}]
+    frame = question.to_frame(to_labels=True)
+    categories = ['Bad', 'So so', 'Good']
+    expected = pd.DataFrame({
+        'How do you rate these cars?: Peugeot': pd.Categorical(['Bad', None], categories,
+                                                               ordered=True),
+        'How do you rate these cars?: Skoda': pd.Categorical(['Good', 'So so'], categories,
+                                                             ordered=True),
+    })
+    assert_frame_equal(frame, expected)
+
+
+def test_optimize_keeps_answers():
+    question = MatrixQuestion('m', choices=['low', 'high'], rows=['a', 'b'],
+                              answers=[{'a': 'high', 'b': 'low'}])
+    question.optimize()
+    assert question.choices == {1: 'low', 2: 'high'}
+    assert question.answers == [{'a': 2, 'b': 1}]
+
+
+def test_summary(question):
+    question.answers = [{'peugeot': 1, 'skoda': 3}, {'skoda': 3}, {'peugeot': 2}]
+    summary = question.summary()
+    assert summary.loc['Peugeot'].tolist() == [1, 1, 0]
+    assert summary.loc['Skoda'].tolist() == [0, 0, 2]
+
+
+def test_survey_get_metadata_per_row(question):
+    metadata = Survey([question]).get_metadata()
+    assert list(metadata) == ['carRatings_peugeot', 'carRatings_skoda']
+    assert metadata['carRatings_skoda'] == {
+        'name': 'carRatings_skoda', 'label': 'How do you rate these cars?: Skoda',
+        'choices': {1: 'Bad', 2: 'So so', 3: 'Good'}
+    }
@@ -2,7 +2,7 @@
 import pytest
 import pandas as pd
 from pandas.testing import assert_series_equal, assert_frame_equal
-from survey_toolkit.core import MultipleChoiceQuestion
+from survey_toolkit.core import MultipleChoiceQuestion, SingleChoiceQuestion
 
 
 @pytest.fixture
@@ -155,3 +155,57 @@ def test_optimize(question):
     question.optimize()
     assert question.choices == {1: 'iPhone', 2: 'Samsung', 3: 'Huawei', 4: 'Xiaomi', 5: 'Nokia'}
     assert question.answers == [[2, 1],  None, [5], [3, 4]]
+
+
+def test_cooccurrence(question):
+    question.choices = {'h': 'Huawei', 'i': 'iPhone', 's': 'Samsung'}
+    question.add_answers([['h', 'i'], ['h', 'i', 's'], ['s'], None, ['i']])
+    cooccurrence = question.cooccurrence(to_labels=False, chunksize=2)
+    dummies = question.to_dummies().fillna(0)
+    expected = dummies.T.dot(dummies).astype('int64')
+    assert cooccurrence.values.tolist() == expected.values.tolist()
+    assert cooccurrence.index.tolist() == ['h', 'i', 's']
+    labelled = question.cooccurrence()
+    assert labelled.index.tolist() == ['Huawei', 'iPhone', 'Samsung']
+    assert labelled.index.name == question.label
+
+
+def test_cooccurrence_lift_and_jaccard(question):
+    question.choices = ['a', 'b', 'c']
+    question.add_answers([['a', 'b'], ['a'], ['b', 'c'], ['c'], []])
+    lift = question.cooccurrence(measure='lift')
+    assert lift.loc['a', 'b'] == pytest.approx(1 / (2 * 2 / 4))
+    assert lift.loc['a', 'c'] == 0
+    jaccard = question.cooccurrence(measure='jaccard')
+    assert jaccard.loc['a', 'b'] == pytest.approx(1 / 3)
+    assert jaccard.loc['c', 'c'] == 1
+    with pytest.raises(ValueError):
+        question.cooccurrence(measure='cosine')
+
+
+def test_cooccurrence_with_other_question(question):
+    question.choices = ['a', 'b']
+    question.add_answers([['a', 'b'], ['a'], None, ['b']])
+    other = SingleChoiceQuestion('gender', 'Gender', choices={1: 'Male', 2: 'Female'})
+    other.add_answers([1, 2, 1, None])
+    cooccurrence = question.cooccurrence(other, to_labels=False)
+    assert cooccurrence.to_dict() == {1: {'a': 1, 'b': 1}, 2: {'a': 1, 'b': 0}}
+    assert question.cooccurrence(other).columns.tolist() == ['Male', 'Female']
+
+
+def test_cooccurrence_reads_answers_once_when_choices_given(question, monkeypatch):
+    question.choices = ['a', 'b']
+    question.add_answers([['a', 'b'], ['a'], None, ['b']])
+    monkeypatch.setattr(MultipleChoiceQuestion, 'get_unique_answers', None)
+    assert question.cooccurrence(to_labels=False).to_dict() == {'a': {'a': 2, 'b': 1},
+                                                                'b': {'a': 1, 'b': 2}}
+
+
+def test_to_dummies_of_empty_selection_with_and_without_labels(question):
+    question.choices = {1: 'Huawei', 2: 'iPhone'}
+    question.answers = [[1], [], None]
+    expected = [[1, 0], [0, 0], [None, None]]
+    assert question.to_dummies().astype(object).where(lambda frame: frame.notna(), None) \
+        .values.tolist() == expected
+    assert question.to_dummies(to_labels=True).astype(object) \
+        .where(lambda frame: frame.notna(), None).values.tolist() == expected
@@ -0,0 +1,79 @@
+# pylint:disable=missing-docstring,redefined-outer-name
+import pytest
+import pandas as pd
+from pandas.testing import assert_frame_equal
+from survey_toolkit.core import Survey, NestedQuestion
+
+
+@pytest.fixture
+def question():
+    return NestedQuestion('children', 'Your children', fields={'name': 'Name', 'age': 'Age'})
+
+
+def test_add_answer_keeps_items(question):
+    question.add_answer([{'name': 'Ann', 'age': 5}, {'name': 'Bob'}])
+    question.add_answer(None)
+    question.add_answer([])
+    question.add_answer([{'age': 12}])
+    assert question.answers == [[{'name': 'Ann', 'age': 5}, {'name': 'Bob'}], None, [],
+                                [{'age': 12}]]
+    assert question.get_offsets().tolist() == [0, 2, 2, 2, 3]
+
+
+def test_add_answer_with_scalar_items():
+    question = NestedQuestion('ranking')
+    question.answers = [['b', 'a'], None, ['a']]
+    assert question.answers == [['b', 'a'], None, ['a']]
+
+
+def test_to_long_frame(question):
+    question.answers = [[{'name': 'Ann', 'age': 5}, {'name': 'Bob'}], None, [{'age': 12}]]
+    expected = pd.DataFrame({
+        'respondent': [0, 0, 2],
+        'item': [0, 1, 0],
+        'name': ['Ann', 'Bob', None],
+        'age': [5, None, 12],
+    })
+    assert_frame_equal(question.to_long_frame(), expected)
+
+
+def test_to_long_frame_since(question):
+    question.answers = [[{'name': 'Ann'}, {'name': 'Bob'}], [{'name': 'Cid'}, {'name': 'Dan'}]]
+    frame = question.to_long_frame(to_labels=True, since=1)
+    assert frame['respondent'].tolist() == [1, 1]
+    assert frame['item'].tolist() == [0, 1]
+    assert frame['Name'].tolist() == ['Cid', 'Dan']
+
+
+def test_summary(question):
+    question.answers = [[{'name': 'Ann', 'age': 5}, {'name': 'Bob', 'age': 7}], [{'name': 'Ann'}]]
+    summary = question.summary()
+    assert summary['name'].to_dict() == {'Ann': 2, 'Bob': 1}
+    assert summary['age']['mean'] == 6
+
+
+def test_concat_merges_fields_with_numeric_keys():
+    wave1 = Survey([NestedQuestion('n', fields={1: 'First'})])
+    wave1.add_results({'n': [{1: 'a'}]})
+    wave2 = Survey([NestedQuestion('n', fields={2: 'Second'})])
+    wave2.add_results({'n': [{2: 'b'}]})
+    question = Survey.concat([wave1, wave2]).questions[0]
+    assert question.fields == {1: 'First', 2: 'Second'}
+    assert question.answers == [[{1: 'a'}], [{2: 'b'}]]
+
+
+def test_add_answer_with_empty_items(question):
+    question.add_answer([{}])
+    assert question.answers == [[{}]]
+    question.add_answer([{}, {'age': 3}])
+    assert question.answers == [[{}], [{}, {'age': 3}]]
+    assert question.get_offsets().tolist() == [0, 1, 3]
+
+
+def test_estimate_frame_size_without_decoding_answers(question, monkeypatch):
+    question.answers = [[{'name': 'Ann', 'age': 5}, {'name': 'Bob'}], None, [], [{'age': 12}]] * 250
+    frame = question.to_frame()
+    monkeypatch.setattr(NestedQuestion, '_get_items', None)
+    estimate = question.estimate_frame_size()
+    actual = frame.memory_usage(deep=True, index=False).sum()
+    assert actual / 2 < estimate < actual * 2
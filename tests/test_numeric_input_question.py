@@ -0,0 +1,89 @@
+# pylint:disable=missing-docstring,redefined-outer-name
+import numpy as np
+import pytest
+import pandas as pd
+from pandas.testing import assert_series_equal
+from survey_toolkit.core import NumericInputQuestion
+
+
+@pytest.fixture
+def question():
+    return NumericInputQuestion('income', 'What is your income?')
+
+
+def test_parse_values_handles_locale_formats():
+    values = ['20', 30, 35.5, '35,5', '1.234,5', '1,234.5', '1 234 567', '1.234.567', '', None]
+    parsed, invalid = NumericInputQuestion.parse_values(values)
+    np.testing.assert_array_equal(
+        parsed, [20, 30, 35.5, 35.5, 1234.5, 1234.5, 1234567, 1234567, np.nan, np.nan])
+    assert not invalid.any()
+
+
+def test_parse_values_masks_unparseable_values():
+    parsed, invalid = NumericInputQuestion.parse_values(['1', 'n/a', '2,5', 'ten'])
+    assert invalid.tolist() == [False, True, False, True]
+    assert np.isnan(parsed[[1, 3]]).all()
+
+
+def test_add_answers(question):
+    invalid = question.add_answers(['20', '35,5', None, 40])
+    assert question.answers == [20, 35.5, None, 40]
+    assert not invalid.any()
+
+
+def test_add_answers_raises_before_adding_anything(question):
+    with pytest.raises(ValueError):
+        question.add_answers(['20', 'n/a'])
+    assert question.answers == []
+
+
+def test_add_answers_with_coercion(question):
+    invalid = question.add_answers(['20', 'n/a'], errors='coerce')
+    assert invalid.tolist() == [False, True]
+    assert question.answers == [20, None]
+
+
+def test_to_series_with_compact_dtype():
+    question = NumericInputQuestion('age', dtype='Int16', answers=[20, None, 35])
+    expected = pd.Series([20, None, 35], dtype='Int16', name='age')
+    assert_series_equal(question.to_series(), expected)
+
+
+@pytest.mark.parametrize('value', ['2,5', 70000, -1])
+def test_integer_dtype_rejects_values_it_cannot_hold(value):
+    dtype = 'UInt16' if value == -1 else 'Int16'
+    question = NumericInputQuestion('age', dtype=dtype)
+    with pytest.raises(ValueError, match='does not fit'):
+        question.add_answer(value)
+    with pytest.raises(ValueError, match='do not fit'):
+        question.add_answers(['20', value])
+    assert question.add_answers(['20', value], errors='coerce').tolist() == [False, True]
+    assert question.to_series().tolist() == [20, pd.NA]
+
+
+def test_export_to_dtype_without_missing_values_raises_clear_error():
+    question = NumericInputQuestion('age', dtype='int16', answers=[20, None])
+    with pytest.raises(ValueError, match='cannot be exported as int16'):
+        question.to_series()
+
+
+@pytest.mark.parametrize('value', ['20', 30, 35.5, '35,5', '1.234,5', '1,234.5', '1 234 567',
+                                   '1.234.567', '1,234', ' 7 ', '', None, float('nan'), 'n/a',
+                                   'nan', "'", '1_000'])
+def test_parse_value_agrees_with_parse_values(value):
+    parsed, invalid = NumericInputQuestion.parse_values([value])
+    if invalid[0]:
+        with pytest.raises(ValueError):
+            NumericInputQuestion.parse_value(value)
+    elif np.isnan(parsed[0]):
+        assert NumericInputQuestion.parse_value(value) is None
+    else:
+        assert NumericInputQuestion.parse_value(value) == parsed[0]
+
+
+def test_answers_parsed_like_batch():
+    question = NumericInputQuestion('income', answers=['1.234,5', '35,5', None])
+    assert question.answers == [1234.5, 35.5, None]
+    with pytest.raises(ValueError):
+        question.add_answer('n/a')
+    assert question.answer_count == 3
@@ -0,0 +1,94 @@
+# pylint:disable=missing-docstring,redefined-outer-name,protected-access
+import pickle
+import threading
+import pytest
+from survey_toolkit.core import (Survey, SingleChoiceQuestion, MultipleChoiceQuestion,
+                                 NumericInputQuestion, TextInputQuestion, MatrixQuestion,
+                                 NestedQuestion)
+from survey_toolkit.dedup import ResultDeduplicator
+
+
+@pytest.fixture()
+def survey():
+    return Survey([SingleChoiceQuestion('q', choices={1: 'Yes', 2: 'No'}),
+                   MultipleChoiceQuestion('m', choices=['a', 'b']),
+                   NumericInputQuestion('id'),
+                   TextInputQuestion('t', dictionary_encoded=True),
+                   MatrixQuestion('g', choices=['bad', 'good'], rows=['r1', 'r2']),
+                   NestedQuestion('n')])
+
+
+def _get_result(number):
+    return {'q': number % 2 + 1, 'm': ['a', 'b'][:number % 3], 'id': number,
+            't': f"text {number % 5}", 'g': {'r1': ['bad', 'good'][number % 2]},
+            'n': [{'x': number}] * (number % 2)}
+
+
+def test_sharded_writer_keeps_rows_aligned_across_threads(survey):
+    def produce(writer, numbers):
+        for number in numbers:
+            writer.add_result(**_get_result(number))
+
+    with survey.sharded_writer(flush_size=7) as writer:
+        threads = [threading.Thread(target=produce, args=(writer, range(start, 400, 4)))
+                   for start in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    assert {question.answer_count for question in survey.questions} == {400}
+    frame = survey.to_pandas()
+    assert sorted(frame['id']) == list(range(400))
+    expected = Survey([question._get_empty_copy() for question in survey.questions])
+    expected.add_results(*[_get_result(int(number)) for number in frame['id']])
+    assert frame.astype(str).equals(expected.to_pandas().astype(str))
+
+
+def test_sharded_writer_flushes_per_thread(survey):
+    writer = survey.sharded_writer(flush_size=2)
+    writer.add_result(**_get_result(1))
+    assert survey.watermark == 0
+    writer.add_result(**_get_result(2))
+    assert survey.watermark == 2
+    writer.add_result(**_get_result(3))
+    writer.flush()
+    assert survey.watermark == 3
+
+
+def test_sharded_writer_drops_rejected_result_from_all_questions(survey):
+    writer = survey.sharded_writer()
+    writer.add_result(**_get_result(1))
+    with pytest.raises(ValueError):
+        writer.add_result(**dict(_get_result(2), g={'r3': 'bad'}))
+    writer.add_result(**_get_result(3))
+    writer.close()
+    assert {question.answer_count for question in survey.questions} == {2}
+    assert survey.get_question('id').answers == [1, 3]
+    assert survey.get_question('n').answers == [[{'x': 1}], [{'x': 3}]]
+
+
+def test_sharded_writer_skips_duplicates(survey):
+    deduplicator = ResultDeduplicator(key='id')
+    with survey.sharded_writer() as writer:
+        assert writer.add_results(_get_result(1), _get_result(1), _get_result(2),
+                                  deduplicator=deduplicator) == 2
+    assert survey.get_question('id').answers == [1, 2]
+
+
+def test_survey_pickles_without_lock(survey):
+    survey.add_result(**_get_result(1))
+    restored = pickle.loads(pickle.dumps(survey))
+    assert restored.get_question('t').answers == ['text 1']
+    with restored.lock:
+        restored.add_result(**_get_result(2))
+    assert restored.watermark == 2
+
+
+def test_sharded_writer_retries_rejected_duplicate(survey):
+    deduplicator = ResultDeduplicator(key='id')
+    with survey.sharded_writer() as writer:
+        with pytest.raises(ValueError):
+            writer.add_results(dict(_get_result(1), g={'r3': 'bad'}), deduplicator=deduplicator)
+        assert writer.add_results(_get_result(1), _get_result(1),
+                                  deduplicator=deduplicator) == 1
+    assert survey.get_question('id').answers == [1]
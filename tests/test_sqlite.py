@@ -0,0 +1,34 @@
+# pylint:disable=missing-docstring
+import sqlite3
+from survey_toolkit.core import Survey, SingleChoiceQuestion, MultipleChoiceQuestion
+
+
+def test_to_sqlite_writes_dimension_tables_and_tidy_answers(tmp_path):
+    survey = Survey([SingleChoiceQuestion('q', 'Do you agree?', choices={1: 'Yes', 2: 'No'}),
+                     MultipleChoiceQuestion('m', choices={'a': 'Apple', 'b': 'Banana'})])
+    survey.add_results({'q': 1, 'm': ['a', 'b']}, {'q': 2}, {'m': ['b']})
+    database = str(tmp_path / 'survey.sqlite')
+    survey.to_sqlite(database, chunksize=2)
+    connection = sqlite3.connect(database)
+    assert connection.execute("SELECT * FROM questions ORDER BY name").fetchall() == [
+        ('m', 'm', 'MultipleChoiceQuestion'), ('q', 'Do you agree?', 'SingleChoiceQuestion')]
+    assert connection.execute("SELECT * FROM choices WHERE question_name = 'q'").fetchall() == [
+        ('q', 1, 'Yes'), ('q', 2, 'No')]
+    assert connection.execute(
+        "SELECT * FROM answers ORDER BY respondent_id, question_name, value_code").fetchall() == [
+            (0, 'm', 'a', 'Apple'), (0, 'm', 'b', 'Banana'), (0, 'q', 1, 'Yes'),
+            (1, 'q', 2, 'No'), (2, 'm', 'b', 'Banana')]
+    connection.close()
+
+
+def test_to_sqlite_appends_delta(tmp_path):
+    survey = Survey([SingleChoiceQuestion('q', choices={1: 'Yes', 2: 'No'})])
+    connection = sqlite3.connect(str(tmp_path / 'survey.sqlite'))
+    survey.add_results({'q': 1})
+    survey.to_sqlite(connection)
+    watermark = survey.watermark
+    survey.add_results({'q': 2})
+    survey.to_sqlite(connection, since=watermark)
+    assert connection.execute("SELECT respondent_id, value_code FROM answers").fetchall() == [
+        (0, 1), (1, 2)]
+    connection.close()
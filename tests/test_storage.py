@@ -0,0 +1,152 @@
+# pylint:disable=missing-docstring,redefined-outer-name
+import sqlite3
+import pytest
+from survey_toolkit.core import (Survey, NumericInputQuestion, TextInputQuestion,
+                                 SingleChoiceQuestion, MultipleChoiceQuestion, MatrixQuestion)
+from survey_toolkit.storage import SQLiteStorage, MemmapStorage
+
+
+@pytest.fixture
+def survey():
+    return Survey([SingleChoiceQuestion('q', choices={1: 'Yes', 2: 'No'}),
+                   MultipleChoiceQuestion('m', choices={'a': 'Apple', 'b': 'Banana'}),
+                   NumericInputQuestion('age'), TextInputQuestion('city'),
+                   MatrixQuestion('g', choices=['bad', 'good'], rows=['r1'])])
+
+
+def _add_results(survey, count):
+    survey.add_results(*[{'q': 1 + nr % 2, 'm': ['a', 'b'][:1 + nr % 2],
+                          'age': nr if nr % 3 else None, 'city': f'city{nr % 4}',
+                          'g': {'r1': 'good'}} for nr in range(count)])
+
+
+@pytest.fixture(params=['sqlite', 'memmap'])
+def storage(request, tmp_path):
+    if request.param == 'sqlite':
+        storage = SQLiteStorage(str(tmp_path / 'answers.sqlite'), buffer_size=7)
+        yield storage
+        storage.close()
+    else:
+        yield MemmapStorage(str(tmp_path / 'answers'), buffer_size=7)
+
+
+def test_store_behaves_like_list(tmp_path):
+    store = SQLiteStorage(str(tmp_path / 'answers.sqlite'), buffer_size=3).create(None)
+    values = [1, None, 'a', [1, 2], 2.5, 'b', None]
+    store.extend(values[:5])
+    store.append(values[5])
+    store.append(values[6])
+    assert len(store) == 7
+    assert list(store) == values
+    assert store[2:6] == values[2:6]
+    assert store[::2] == values[::2]
+    assert store[-1] is None
+    assert store[3] == [1, 2]
+    with pytest.raises(IndexError):
+        store[7]  # pylint:disable=pointless-statement
+
+
+def test_set_storage_moves_supported_questions(survey, storage):
+    _add_results(survey, 5)
+    moved = survey.set_storage(storage)
+    if isinstance(storage, SQLiteStorage):
+        assert moved == ['q', 'm', 'age', 'city']
+    else:
+        assert moved == ['age']
+    assert survey.get_question('age').answers[:5] == [None, 1, 2, None, 4]
+
+
+def test_stored_survey_gives_same_results_as_in_memory_one(survey, storage):
+    in_memory = Survey([SingleChoiceQuestion('q', choices={1: 'Yes', 2: 'No'}),
+                        MultipleChoiceQuestion('m', choices={'a': 'Apple', 'b': 'Banana'}),
+                        NumericInputQuestion('age'), TextInputQuestion('city'),
+                        MatrixQuestion('g', choices=['bad', 'good'], rows=['r1'])])
+    survey.set_storage(storage)
+    _add_results(survey, 30)
+    _add_results(in_memory, 30)
+    for question, expected in zip(survey.questions, in_memory.questions):
+        assert question.answers[:] == expected.answers[:]
+        assert question.summary().equals(expected.summary())
+    assert survey.to_pandas(columns=['q', 'age']).equals(
+        in_memory.to_pandas(columns=['q', 'age']))
+    assert survey.crosstab('q', 'm', chunksize=4).equals(in_memory.crosstab('q', 'm'))
+
+
+def test_crosstab():
+    survey = Survey([SingleChoiceQuestion('q', 'Agree?', choices={1: 'Yes', 2: 'No'}),
+                     MultipleChoiceQuestion('m', 'Fruits', choices={'a': 'Apple', 'b': 'Banana'})])
+    survey.add_results({'q': 1, 'm': ['a', 'b']}, {'q': 1, 'm': ['a']}, {'q': 2}, {'m': ['b']})
+    table = survey.crosstab('q', 'm', chunksize=3)
+    assert table.to_dict() == {'Apple': {'Yes': 2, 'No': 0}, 'Banana': {'Yes': 1, 'No': 0}}
+    assert table.index.name == 'Agree?'
+    assert survey.crosstab('q', 'm', to_labels=False).to_dict() == {'a': {1: 2, 2: 0},
+                                                                    'b': {1: 1, 2: 0}}
+
+
+def test_optimized_export_writes_no_new_stores(survey, tmp_path):
+    path = str(tmp_path / 'answers.sqlite')
+    storage = SQLiteStorage(path, buffer_size=7)
+    survey.set_storage(storage)
+    _add_results(survey, 20)
+    connection = sqlite3.connect(path)
+    table_count = connection.execute("SELECT COUNT(*) FROM sqlite_master").fetchone()[0]
+    for since in [0, 10, 15]:
+        survey.to_pandas(optimize=True, since=since)
+    assert connection.execute("SELECT COUNT(*) FROM sqlite_master").fetchone()[0] == table_count
+    connection.close()
+    storage.close()
+
+
+def test_replaced_stores_are_dropped(survey, tmp_path):
+    path = str(tmp_path / 'answers.sqlite')
+    storage = SQLiteStorage(path, buffer_size=7)
+    survey.set_storage(storage)
+    _add_results(survey, 20)
+    connection = sqlite3.connect(path)
+    table_count = connection.execute("SELECT COUNT(*) FROM sqlite_master").fetchone()[0]
+    survey.get_question('m').optimize()
+    concatenated = Survey.concat([survey, survey])
+    assert connection.execute("SELECT COUNT(*) FROM sqlite_master").fetchone()[0] == \
+        table_count * 2
+    assert survey.get_question('m').answers[:2] == [[1], [1, 2]]
+    concatenated.set_storage(None)
+    survey.set_storage(None)
+    assert connection.execute("SELECT COUNT(*) FROM sqlite_master").fetchone()[0] == 0
+    assert concatenated.get_question('m').answers[20:22] == [[1], [1, 2]]
+    connection.close()
+    storage.close()
+
+
+def test_memmap_file_is_removed_when_answers_move(survey, tmp_path):
+    survey.set_storage(MemmapStorage(str(tmp_path / 'answers'), buffer_size=7))
+    _add_results(survey, 20)
+    assert len(list((tmp_path / 'answers').iterdir())) == 1
+    survey.set_storage(None)
+    assert not list((tmp_path / 'answers').iterdir())
+    assert survey.get_question('age').answers[:3] == [None, 1, 2]
+
+
+def test_iter_frames_reads_storage_chunk_by_chunk(survey, tmp_path):
+    path = str(tmp_path / 'answers.sqlite')
+    storage = SQLiteStorage(path, buffer_size=7)
+    survey.set_storage(storage)
+    _add_results(survey, 20)
+    connection = sqlite3.connect(path)
+    table_count = connection.execute("SELECT COUNT(*) FROM sqlite_master").fetchone()[0]
+    chunks = list(survey.iter_frames(chunksize=6, optimize=True))
+    assert connection.execute("SELECT COUNT(*) FROM sqlite_master").fetchone()[0] == table_count
+    assert [len(chunk) for chunk in chunks] == [6, 6, 6, 2]
+    assert chunks[0]['m'].tolist()[:2] == [[1], [1, 2]]
+    connection.close()
+    storage.close()
+
+
+def test_add_result_rolls_back_stored_answers(survey, storage):
+    survey.set_storage(storage)
+    _add_results(survey, 13)
+    with pytest.raises(ValueError):
+        survey.add_result(q=1, m=['a'], age=5, city='x', g={'r1': 'terrible'})
+    assert {question.answer_count for question in survey.questions} == {13}
+    _add_results(survey, 2)
+    assert list(survey.get_question('age').answers) == \
+        [nr if nr % 3 else None for nr in range(13)] + [None, 1]
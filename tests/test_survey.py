@@ -1,7 +1,11 @@
-# pylint:disable=missing-docstring,redefined-outer-name
+# pylint:disable=missing-docstring,redefined-outer-name,protected-access
+import asyncio
 import pytest
+import pandas as pd
+from pandas.testing import assert_frame_equal
 from survey_toolkit.core import (Survey, Question, NumericInputQuestion, TextInputQuestion,
-                                 SingleChoiceQuestion, MultipleChoiceQuestion)
+                                 SingleChoiceQuestion, MultipleChoiceQuestion, MatrixQuestion,
+                                 NestedQuestion)
 
 
 @pytest.fixture()
@@ -180,6 +184,46 @@ def test_from_surveyjs_parses_single_choice_matrix_question_with_dicts(basic_sur
                                                                    [5, None, 3, None]]
 
 
+def test_from_surveyjs_parses_matrix_question_as_block(basic_surveyjs_json):
+    q_name = "carBrandRatings"
+    q_label = "How do you rate the following car brands?"
+    question_json = {
+        "type": "matrix", "name": q_name, "title": q_label, "columns": ["1", "2", "3", "4", "5"],
+        "rows": [{"value": "peugeot", "text": "Peugeot"}, {"value": "skoda", "text": "Skoda"}]
+    }
+    survey_json = _get_surveyjs_json(basic_surveyjs_json, question_json)
+    survey_results = [
+        '{"carBrandRatings": {"peugeot": "1", "skoda": "5"}}',
+        '{"carBrandRatings": {"peugeot": "5"}}',
+        '{"carBrandRatings": {"skoda": "3"}}',
+        '{}'
+    ]
+    survey = Survey.from_surveyjs(survey_json, survey_results, matrix_as_block=True)
+    question = survey.questions[0]
+    assert type(question) == MatrixQuestion
+    assert question.label == q_label
+    assert list(survey.to_pandas().columns) == [q_name + "_peugeot", q_name + "_skoda"]
+    assert list(survey.to_pandas(to_labels=True).columns) == [q_label + ": Peugeot",
+                                                              q_label + ": Skoda"]
+    assert survey.to_pandas()[q_name + "_skoda"].cat.codes.tolist() == [4, -1, 2, -1]
+
+
+def test_from_surveyjs_parses_paneldynamic_question(basic_surveyjs_json):
+    question_json = {
+        "type": "paneldynamic", "name": "children", "title": "Your children",
+        "templateElements": [{"type": "text", "name": "name", "title": "Name"},
+                             {"type": "text", "name": "age", "inputType": "number"}]
+    }
+    survey_json = _get_surveyjs_json(basic_surveyjs_json, question_json)
+    survey_results = ['{"children": [{"name": "Ann", "age": 5}, {"name": "Bob", "age": 7}]}',
+                      '{}']
+    survey = Survey.from_surveyjs(survey_json, survey_results)
+    question = survey.questions[0]
+    assert type(question) == NestedQuestion
+    assert question.fields == {"name": "Name", "age": "age"}
+    assert question.answers == [[{"name": "Ann", "age": 5}, {"name": "Bob", "age": 7}], None]
+
+
 def test_from_surveyjs_parses_multiple_text(basic_surveyjs_json):
     question_json = {
         "type": "multipletext", "name": "name", "title": "What's your name?",
@@ -196,3 +240,287 @@ def test_from_surveyjs_parses_multiple_text(basic_surveyjs_json):
     assert [question.label for question in survey.questions] == ["What's your name?: First name",
                                                                  "What's your name?: Last name"]
     assert [question.answers for question in survey.questions] == [["John", None], ["Doe", None]]
+
+
+async def _async_rows(rows):
+    for row in rows:
+        yield row
+
+
+def test_aconsume_ingests_results_in_micro_batches(basic_surveyjs_json):
+    survey_json = _get_surveyjs_json(
+        basic_surveyjs_json,
+        {"type": "text", "name": "age", "title": "How old are you?", "inputType": "number"}
+    )
+    survey = Survey.from_surveyjs(survey_json)
+    rows = ['{"age": %d}' % age for age in range(10)] + ['{}']
+    consumed = asyncio.run(survey.aconsume(_async_rows(rows), batch_size=3, max_pending=1))
+    assert consumed == 11
+    assert survey.questions[0].answers == [float(age) for age in range(10)] + [None]
+
+
+def test_aconsume_keeps_survey_queryable_during_ingestion(basic_surveyjs_json):
+    survey_json = _get_surveyjs_json(
+        basic_surveyjs_json,
+        {"type": "text", "name": "age", "title": "How old are you?", "inputType": "number"}
+    )
+    survey = Survey.from_surveyjs(survey_json)
+    seen_sizes = []
+
+    async def rows():
+        for age in range(6):
+            seen_sizes.append(len(survey.questions[0].answers))
+            yield {"age": age}
+            await asyncio.sleep(0)
+
+    asyncio.run(survey.aconsume(rows(), batch_size=2))
+    assert seen_sizes == sorted(seen_sizes)
+    assert all(size % 2 == 0 for size in seen_sizes)
+    assert len(survey.questions[0].answers) == 6
+
+
+def test_aconsume_propagates_source_errors(basic_surveyjs_json):
+    survey_json = _get_surveyjs_json(basic_surveyjs_json, {"type": "text", "name": "city"})
+    survey = Survey.from_surveyjs(survey_json)
+
+    async def rows():
+        yield '{"city": "Lodz"}'
+        raise RuntimeError("queue closed")
+
+    with pytest.raises(RuntimeError):
+        asyncio.run(survey.aconsume(rows(), batch_size=1))
+    assert survey.questions[0].answers == ["Lodz"]
+
+
+def test_watermark_counts_added_respondents():
+    survey = Survey([SingleChoiceQuestion('q1', choices=['a', 'b'])])
+    assert survey.watermark == 0
+    survey.add_results({'q1': 'a'}, {'q1': 'b'}, {})
+    assert survey.watermark == 3
+
+
+def test_to_pandas_since_watermark_exports_only_new_respondents():
+    question = MultipleChoiceQuestion('phones')
+    survey = Survey([question, NumericInputQuestion('age')])
+    survey.add_results({'phones': ['Nokia'], 'age': 20}, {'phones': ['Huawei'], 'age': 30})
+    watermark = survey.watermark
+    survey.add_results({'phones': ['iPhone'], 'age': 40}, {'age': 50})
+    delta = survey.to_pandas(to_dummies=True, optimize=True, since=watermark)
+    full = survey.to_pandas(to_dummies=True, optimize=True)
+    assert list(delta.index) == [2, 3]
+    assert list(delta.columns) == list(full.columns)
+    assert_frame_equal(delta, full.iloc[watermark:])
+
+
+def test_to_pandas_since_watermark_keeps_full_choice_encoding():
+    survey = Survey([SingleChoiceQuestion('brand')])
+    survey.add_results({'brand': 'Skoda'}, {'brand': 'Audi'}, {'brand': 'Skoda'})
+    delta = survey.to_pandas(optimize=True, since=2)
+    expected = pd.DataFrame(
+        {'brand': pd.Categorical([2], categories=[1, 2], ordered=True)},
+        index=pd.RangeIndex(2, 3)
+    )
+    assert_frame_equal(delta, expected)
+
+
+def test_to_pandas_since_watermark_optimizes_only_delta(monkeypatch):
+    question = SingleChoiceQuestion('brand', choices=['Skoda', 'Audi'])
+    survey = Survey([question])
+    survey.add_results(*[{'brand': 'Skoda'}] * 100, {'brand': 'Audi'})
+    remapped = []
+    remap_answers = question._remap_answers
+    monkeypatch.setattr(question, '_remap_answers',
+                        lambda answers, mapping: remapped.append(len(answers)) or
+                        remap_answers(answers, mapping))
+    delta = survey.to_pandas(optimize=True, since=100)
+    assert remapped == [1]
+    assert delta['brand'].tolist() == [2]
+    assert question.choices == {'Skoda': 'Skoda', 'Audi': 'Audi'}
+
+
+def test_memory_usage_per_question_and_type():
+    survey = Survey([SingleChoiceQuestion('q1', choices=['a', 'b']), TextInputQuestion('q2'),
+                     TextInputQuestion('q3', dictionary_encoded=True)])
+    survey.add_results(*[{'q1': 'a', 'q2': 'Lodz', 'q3': 'Lodz'}] * 100)
+    usage = survey.memory_usage()
+    assert list(usage.index) == ['q1', 'q2', 'q3']
+    assert list(usage.columns) == ['type', 'answers', 'choices', 'derived', 'total']
+    assert usage.loc['q1', 'choices'] > 0
+    assert usage.loc['q3', 'answers'] < usage.loc['q2', 'answers']
+    assert (usage['total'] == usage[['answers', 'choices', 'derived']].sum(axis=1)).all()
+    by_type = survey.memory_usage(by_type=True)
+    assert by_type.loc['TextInputQuestion', 'total'] == usage.loc[['q2', 'q3'], 'total'].sum()
+
+
+def test_estimate_frame_size_is_close_to_actual_size():
+    survey = Survey([SingleChoiceQuestion('q1', choices=['a', 'b']), NumericInputQuestion('q2'),
+                     MultipleChoiceQuestion('q3', choices=['x', 'y', 'z'])])
+    survey.add_results(*[{'q1': 'a', 'q2': nr, 'q3': ['x']} for nr in range(1000)])
+    for to_dummies in [False, True]:
+        estimate = survey.estimate_frame_size(to_dummies=to_dummies)
+        actual = survey.to_pandas(to_dummies=to_dummies).memory_usage(deep=True,
+                                                                      index=False).sum()
+        assert actual / 2 < estimate < actual * 2
+
+
+def test_concat_aligns_questions_by_name():
+    wave1 = Survey([NumericInputQuestion('age'), TextInputQuestion('city')])
+    wave1.add_results({'age': 20, 'city': 'Lodz'}, {'age': 30})
+    wave2 = Survey([TextInputQuestion('city'), TextInputQuestion('opinion')])
+    wave2.add_results({'city': 'Gdansk', 'opinion': 'fine'})
+    survey = Survey.concat([wave1, wave2])
+    assert [question.name for question in survey.questions] == ['age', 'city', 'opinion']
+    assert [question.answers for question in survey.questions] == [
+        [20, 30, None], ['Lodz', None, 'Gdansk'], [None, None, 'fine']]
+    assert wave1.questions[0].answers == [20, 30]
+
+
+def test_concat_harmonizes_choices():
+    wave1 = Survey([SingleChoiceQuestion('q', choices={1: 'Yes', 2: 'No'}),
+                    MultipleChoiceQuestion('m', choices={'a': 'Apple', 'b': 'Banana'})])
+    wave1.add_results({'q': 1, 'm': ['a']}, {'q': 2, 'm': ['b']})
+    wave2 = Survey([SingleChoiceQuestion('q', choices={1: 'No', 2: 'Yes', 3: 'Maybe'}),
+                    MultipleChoiceQuestion('m', choices={'b': 'Cherry', 'a': 'Apple'})])
+    wave2.add_results({'q': 1, 'm': ['a', 'b']}, {'q': 3})
+    survey = Survey.concat([wave1, wave2])
+    single, multiple = survey.questions
+    assert single.choices == {1: 'Yes', 2: 'No', 3: 'Maybe'}
+    assert single.answers == [1, 2, 2, 3]
+    assert multiple.choices == {'a': 'Apple', 'b': 'Banana', 'b_1': 'Cherry'}
+    assert multiple.answers == [['a'], ['b'], ['a', 'b_1'], None]
+
+
+def test_concat_matrix_and_encoded_text_questions():
+    wave1 = Survey([MatrixQuestion('m', choices=['bad', 'good'], rows=['r1']),
+                    TextInputQuestion('t', dictionary_encoded=True)])
+    wave1.add_results({'m': {'r1': 'good'}, 't': 'x'})
+    wave2 = Survey([MatrixQuestion('m', choices=['good', 'bad'], rows=['r2', 'r1']),
+                    TextInputQuestion('t', dictionary_encoded=True)])
+    wave2.add_results({'m': {'r1': 'bad', 'r2': 'good'}, 't': 'y'}, {'t': 'x'})
+    survey = Survey.concat([wave1, wave2])
+    matrix, text = survey.questions
+    assert matrix.answers == [{'r1': 'good', 'r2': None}, {'r1': 'bad', 'r2': 'good'},
+                              {'r1': None, 'r2': None}]
+    assert text.answers == ['x', 'y', 'x']
+    assert text.get_value_counts() == {'x': 2, 'y': 1}
+
+
+def test_concat_mixed_choice_keys_and_numeric_rows():
+    wave1 = Survey([SingleChoiceQuestion('q', choices={1: 'Yes'}),
+                    MatrixQuestion('m', choices=['bad', 'good'], rows={1: 'First'})])
+    wave1.add_results({'q': 1, 'm': {1: 'good'}})
+    wave2 = Survey([SingleChoiceQuestion('q', choices={'a': 'Apple'}),
+                    MatrixQuestion('m', choices=['bad', 'good'], rows={2: 'Second'})])
+    wave2.add_results({'q': 'a', 'm': {2: 'bad'}})
+    survey = Survey.concat([wave1, wave2])
+    survey.add_results({'q': 'a'}, {'q': 1, 'm': {1: 'bad'}})
+    single, matrix = survey.questions
+    assert single.answers == [1, 'a', 'a', 1]
+    assert matrix.rows == {1: 'First', 2: 'Second'}
+    assert matrix.answers[:2] == [{1: 'good', 2: None}, {1: None, 2: 'bad'}]
+    single.optimize()
+    assert single.choices == {1: 'Yes', 2: 'Apple'}
+    assert single.answers == [1, 2, 2, 1]
+
+
+def test_concat_raises_exception_when_question_types_differ():
+    with pytest.raises(ValueError):
+        Survey.concat([Survey([TextInputQuestion('q')]), Survey([NumericInputQuestion('q')])])
+
+
+def test_iter_tidy_yields_chunks_of_tidy_tuples():
+    survey = Survey([SingleChoiceQuestion('q', choices={1: 'Yes', 2: 'No'}),
+                     MultipleChoiceQuestion('m', choices={'a': 'Apple', 'b': 'Banana'}),
+                     MatrixQuestion('g', choices=['bad', 'good'], rows=['r1', 'r2']),
+                     NumericInputQuestion('age')])
+    survey.add_results({'q': 1, 'm': ['a', 'b'], 'g': {'r2': 'good'}, 'age': 20},
+                       {'q': 2},
+                       {'m': ['b'], 'age': 30})
+    chunks = list(survey.iter_tidy(chunksize=2))
+    assert chunks == [
+        [(0, 'q', 1, 'Yes'), (1, 'q', 2, 'No'), (0, 'm', 'a', 'Apple'), (0, 'm', 'b', 'Banana'),
+         (0, 'g_r2', 'good', 'good'), (0, 'age', 20, None)],
+        [(2, 'm', 'b', 'Banana'), (2, 'age', 30, None)],
+    ]
+    assert list(survey.iter_tidy(since=2)) == chunks[1:]
+
+
+@pytest.mark.parametrize('to_labels, to_dummies, optimize', [
+    (False, False, False), (False, True, True), (True, True, False)])
+def test_iter_frames_chunks_match_full_export(to_labels, to_dummies, optimize):
+    survey = Survey([SingleChoiceQuestion('q', choices={'y': 'Yes', 'n': 'No'}),
+                     MultipleChoiceQuestion('m', choices={'a': 'Apple', 'b': 'Banana'}),
+                     MatrixQuestion('g', choices=['bad', 'good'], rows=['r1', 'r2']),
+                     TextInputQuestion('t', dictionary_encoded=True),
+                     NumericInputQuestion('age')])
+    survey.add_results({'q': 'y', 'm': ['a'], 'g': {'r2': 'good'}, 'age': 20, 't': 'hi'},
+                       {'q': 'n', 'm': ['a'], 't': 'yo'},
+                       {},
+                       {'m': ['a', 'b'], 'age': 30},
+                       {})
+    full = survey.to_pandas(to_labels=to_labels, to_dummies=to_dummies, optimize=optimize)
+    chunks = list(survey.iter_frames(chunksize=2, to_labels=to_labels, to_dummies=to_dummies,
+                                     optimize=optimize))
+    assert [len(chunk) for chunk in chunks] == [2, 2, 1]
+    for chunk in chunks:
+        assert chunk.dtypes.to_dict() == full.dtypes.to_dict()
+    assert_frame_equal(pd.concat(chunks), full)
+
+
+@pytest.mark.parametrize('to_labels, to_dummies, optimize', [
+    (True, True, False), (False, True, False), (False, False, True)])
+def test_iter_frames_finds_unique_answers_once(monkeypatch, to_labels, to_dummies, optimize):
+    survey = Survey([SingleChoiceQuestion('q'), MultipleChoiceQuestion('m')])
+    survey.add_results(*[{'q': f'q{nr % 3}', 'm': [f'm{nr % 4}']} for nr in range(10)])
+    full = survey.to_pandas(to_labels=to_labels, to_dummies=to_dummies, optimize=optimize)
+    calls = []
+    get_unique_answers = Question.get_unique_answers
+    monkeypatch.setattr(Question, 'get_unique_answers',
+                        lambda self: calls.append(self.name) or get_unique_answers(self))
+    chunks = list(survey.iter_frames(chunksize=3, to_labels=to_labels, to_dummies=to_dummies,
+                                     optimize=optimize))
+    assert sorted(calls) == ['m', 'q']
+    assert_frame_equal(pd.concat(chunks), full)
+
+
+def test_iter_frames_since_and_columns():
+    survey = Survey([SingleChoiceQuestion('q', choices={1: 'Yes', 2: 'No'}),
+                     NumericInputQuestion('age')])
+    survey.add_results({'q': 1, 'age': 20}, {'q': 2}, {'age': 30})
+    chunks = list(survey.iter_frames(chunksize=1, since=1, columns=['age']))
+    assert [chunk.index.tolist() for chunk in chunks] == [[1], [2]]
+    assert all(chunk.columns.tolist() == ['age'] for chunk in chunks)
+    assert chunks[1]['age'].tolist() == [30]
+
+
+def test_add_result_rolls_back_rejected_result():
+    survey = Survey([NumericInputQuestion('n'), SingleChoiceQuestion('g', choices=['a']),
+                     MatrixQuestion('grid', choices=[1, 2], rows=['r1'])])
+    survey.add_result(n=1, g='a')
+    with pytest.raises(ValueError):
+        survey.add_result(n=2, g='x')
+    with pytest.raises(ValueError):
+        survey.add_result(n=3, g='a', grid={'r2': 1})
+    assert [question.answer_count for question in survey.questions] == [1, 1, 1]
+    assert survey.get_question('n').answers == [1]
+
+
+def test_add_results_parses_numeric_answers_in_one_batch(monkeypatch):
+    survey = Survey([NumericInputQuestion('n'), SingleChoiceQuestion('g', choices=['a'])])
+    batches = []
+    parse_values = NumericInputQuestion.parse_values
+    monkeypatch.setattr(NumericInputQuestion, 'parse_values',
+                        staticmethod(lambda values: batches.append(list(values)) or
+                                     parse_values(values)))
+    assert survey.add_results({'n': '1,5', 'g': 'a'}, {'n': 2}, {'g': 'a'}) == 3
+    assert batches == [['1,5', 2, None]]
+    assert survey.get_question('n').answers == [1.5, 2, None]
+
+
+def test_add_results_adds_nothing_if_any_answer_is_rejected():
+    survey = Survey([NumericInputQuestion('n'), SingleChoiceQuestion('g', choices=['a'])])
+    with pytest.raises(ValueError):
+        survey.add_results({'n': 1, 'g': 'a'}, {'n': 2, 'g': 'x'})
+    with pytest.raises(ValueError):
+        survey.add_results({'n': 1, 'g': 'a'}, {'n': 'n/a', 'g': 'a'})
+    assert [question.answer_count for question in survey.questions] == [0, 0]
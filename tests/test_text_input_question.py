@@ -0,0 +1,40 @@
+# pylint:disable=missing-docstring,redefined-outer-name
+import pytest
+import pandas as pd
+from pandas.testing import assert_series_equal
+from survey_toolkit.core import TextInputQuestion
+
+
+@pytest.fixture
+def question():
+    return TextInputQuestion('city', 'Where do you live?', dictionary_encoded=True)
+
+
+def test_add_answer_interns_values(question):
+    question.answers = ['Lodz', 'Gdansk', None, 'Lodz']
+    assert question.answers == ['Lodz', 'Gdansk', None, 'Lodz']
+    assert question.answer_count == 4
+    assert question.get_value_counts() == {'Lodz': 2, 'Gdansk': 1}
+
+
+def test_to_series_returns_categorical(question):
+    question.answers = ['Lodz', 'Gdansk', None, 'Lodz']
+    expected = pd.Series(pd.Categorical(['Lodz', 'Gdansk', None, 'Lodz'],
+                                        categories=['Lodz', 'Gdansk']), name='city')
+    assert_series_equal(question.to_series(), expected)
+
+
+def test_to_series_since(question):
+    question.answers = ['Lodz', 'Gdansk', None, 'Lodz']
+    series = question.to_series(since=2)
+    assert list(series.index) == [2, 3]
+    assert list(series.cat.categories) == ['Lodz', 'Gdansk']
+
+
+@pytest.mark.parametrize('dictionary_encoded', [False, True])
+def test_summary_counts_words_by_frequency(dictionary_encoded):
+    question = TextInputQuestion('opinion', dictionary_encoded=dictionary_encoded)
+    question.answers = ['Great service', 'great SERVICE', None, 'the service was slow']
+    summary = question.summary()
+    assert summary.to_dict() == {'service': 3, 'great': 2, 'slow': 1}
+    assert summary.name == 'opinion'